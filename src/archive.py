@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Daily archive pages
+每天的榜单存档，避免新一轮抓取覆盖掉昨天的内容
+
+    data/archive/YYYY-MM-DD.json          当天出现过的全部条目 (按榜单，首次出现顺序，热度取最新)
+    dist/archive/index.html               按日期列出所有存档
+    dist/archive/YYYY-MM-DD/index.html    当天各榜单概览
+    dist/archive/YYYY-MM-DD/<board>.html  当天单个榜单
+    dist/archive/manifest.json            每天已渲染的内容哈希和条目数
+
+增量生成：快照文件和模板的哈希没变的日期直接跳过 (只读文件字节，不解析 JSON)，
+需要重新渲染的日期分发到进程池并行处理；正常一轮只有当天需要渲染。
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from glob import glob
+from typing import Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader
+
+from boards import BOARD_TITLES, heat_value
+from rank_diff import item_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVE_DATA_DIR = os.path.join(BASE_DIR, 'data', 'archive')
+TEMPLATE_NAME = 'archive.html'
+
+# 每个榜单每天最多保留的条目数
+ARCHIVE_MAX_ITEMS = int(os.environ.get('ARCHIVE_MAX_ITEMS', '100'))
+ARCHIVE_WORKERS = min(os.cpu_count() or 2, 4)
+
+
+def _archive_item(item: Dict) -> Dict:
+    """只保留存档页需要的字段，快照文件保持很小"""
+    record = {
+        'title': item.get('title') or item.get('full_name') or item.get('name') or '',
+        'url': item.get('url') or '',
+    }
+    heat = heat_value(item)
+    if heat is not None:
+        record['heat'] = heat
+    summary = item.get('summary') or item.get('description')
+    if summary:
+        record['summary'] = summary
+    if item.get('link_status'):
+        record['link_status'] = item['link_status']
+    return record
+
+
+def merge_snapshot(snapshot: Dict[str, List[Dict]], boards: Dict[str, List[Dict]], seen_at: str) -> Dict:
+    """把本轮的榜单并入当天快照：新条目追加在后面，已有条目更新热度等字段"""
+    merged = {}
+    for board in sorted(set(snapshot) | set(boards)):
+        records = [dict(record) for record in snapshot.get(board, [])]
+        index = {item_key(record): record for record in records}
+        for item in boards.get(board, []):
+            record = _archive_item(item)
+            existing = index.get(item_key(record))
+            if existing is not None:
+                existing.update(record)
+                if 'link_status' not in record:
+                    existing.pop('link_status', None)
+            elif len(records) < ARCHIVE_MAX_ITEMS:
+                record['first_seen'] = seen_at
+                records.append(record)
+                index[item_key(record)] = record
+        if records:
+            merged[board] = records
+    return merged
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def record_day(boards: Dict[str, List[Dict]], now: Optional[datetime] = None, data_dir: str = ARCHIVE_DATA_DIR) -> str:
+    """更新当天 (UTC) 的快照文件，内容没变时不重写；返回日期"""
+    now = now or datetime.now(timezone.utc)
+    day = now.strftime('%Y-%m-%d')
+    path = os.path.join(data_dir, f'{day}.json')
+    previous = _read_json(path) or {}
+    snapshot = merge_snapshot(previous, boards, now.strftime('%H:%M'))
+    if snapshot != previous:
+        os.makedirs(data_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=1)
+    return day
+
+
+def _digest(*paths: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+_env = None
+
+
+def _template(template_dir: str):
+    # 每个工作进程只创建一次 Jinja 环境
+    global _env
+    if _env is None:
+        _env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
+    return _env.get_template(TEMPLATE_NAME)
+
+
+def render_day(day: str, snapshot_path: str, template_dir: str, archive_dir: str) -> Dict[str, int]:
+    """渲染一天的概览页和各榜单页 (在工作进程中执行)，返回各榜单条目数"""
+    with open(snapshot_path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    template = _template(template_dir)
+    day_dir = os.path.join(archive_dir, day)
+    os.makedirs(day_dir, exist_ok=True)
+
+    boards = [(board, BOARD_TITLES.get(board, board), snapshot[board])
+              for board in BOARD_TITLES if board in snapshot]
+    with open(os.path.join(day_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(template.render(page='day', day=day, boards=boards, root='../../'))
+    for board, title, items in boards:
+        with open(os.path.join(day_dir, f'{board}.html'), 'w', encoding='utf-8') as f:
+            f.write(template.render(page='board', day=day, board=board, title=title, items=items, root='../../'))
+    return {board: len(items) for board, _, items in boards}
+
+
+def publish_archive(boards: Dict[str, List[Dict]], output_dir: str, template_dir: str,
+                    data_dir: str = ARCHIVE_DATA_DIR) -> int:
+    """记录当天快照，重新渲染有变化的日期和存档首页，返回渲染的天数"""
+    record_day(boards, data_dir=data_dir)
+    return render_archive(output_dir, template_dir, data_dir)
+
+
+def render_archive(output_dir: str, template_dir: str, data_dir: str = ARCHIVE_DATA_DIR) -> int:
+    """只渲染快照或模板有变化的日期 (不写 data/，preview.py 也用它)"""
+    archive_dir = os.path.join(output_dir, 'archive')
+    manifest_path = os.path.join(archive_dir, 'manifest.json')
+    manifest = _read_json(manifest_path) or {}
+    template_rev = _digest(os.path.join(template_dir, TEMPLATE_NAME))
+
+    snapshots = {os.path.basename(path)[:-len('.json')]: path
+                 for path in glob(os.path.join(data_dir, '????-??-??.json'))}
+    pending = {}
+    for day, path in snapshots.items():
+        revision = f"{_digest(path)}-{template_rev}"
+        entry = manifest.get(day)
+        if not entry or entry.get('revision') != revision or \
+                not os.path.exists(os.path.join(archive_dir, day, 'index.html')):
+            pending[day] = revision
+
+    if pending:
+        workers = min(ARCHIVE_WORKERS, len(pending))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {day: pool.submit(render_day, day, snapshots[day], template_dir, archive_dir)
+                           for day in pending}
+                counts = {day: future.result() for day, future in futures.items()}
+        else:
+            counts = {day: render_day(day, snapshots[day], template_dir, archive_dir) for day in pending}
+        for day, revision in pending.items():
+            manifest[day] = {'revision': revision, 'counts': counts[day]}
+
+    # 快照被删掉的日期不再出现在首页
+    manifest = {day: entry for day, entry in sorted(manifest.items(), reverse=True) if day in snapshots}
+    if pending or not os.path.exists(os.path.join(archive_dir, 'index.html')) or \
+            manifest != (_read_json(manifest_path) or {}):
+        days = [(day, sum(entry['counts'].values()), entry['counts']) for day, entry in manifest.items()]
+        os.makedirs(archive_dir, exist_ok=True)
+        with open(os.path.join(archive_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(_template(template_dir).render(page='index', days=days, titles=BOARD_TITLES, root='../'))
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    print(f"🗄️  Archive: {len(pending)}/{len(snapshots)} days rendered in {archive_dir}")
+    return len(pending)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Board definitions shared by the pipeline stages
+榜单定义：榜单名 -> enriched_trending.json 中的位置
+"""
+from typing import Dict, List
+
+# 榜单名 -> enriched_trending.json 中的路径
+ENRICHED_BOARDS = {
+    'weibo': ('domestic_trending', 'weibo'),
+    'zhihu': ('domestic_trending', 'zhihu'),
+    'bilibili': ('domestic_trending', 'bilibili'),
+    'producthunt': ('ai_trending', 'producthunt'),
+    'huggingface': ('ai_trending', 'huggingface'),
+    'ai_news': ('ai_trending', 'ai_news'),
+    'entertainment': ('entertainment_trending',),
+    'parenting': ('parenting_trending',),
+    'gaming': ('gaming_trending',),
+}
+
+# 榜单展示名称 (feed 标题等)
+BOARD_TITLES = {
+    'hacker_news': 'Hacker News AI',
+    'github': 'GitHub AI Trending',
+    'weibo': '今日头条榜',
+    'zhihu': '知乎热榜',
+    'bilibili': 'B站热门',
+    'producthunt': 'AI科技热榜 (36氪)',
+    'huggingface': 'HuggingFace热门模型',
+    'ai_news': 'AI新闻',
+    'entertainment': '大馋猫吃瓜榜单',
+    'parenting': '育儿知识热榜',
+    'gaming': '游戏热搜榜',
+}
+
+# 各榜单表示热度的字段，按优先级
+HEAT_FIELDS = ('hot', 'votes', 'downloads', 'score', 'stars')
+
+
+def enriched_boards(enriched: Dict) -> Dict[str, List[Dict]]:
+    """按 ENRICHED_BOARDS 取出每个榜单的条目列表 (返回的是原列表，可以原地修改条目)"""
+    boards = {}
+    for name, path in ENRICHED_BOARDS.items():
+        node = enriched
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, list):
+            boards[name] = node
+    return boards
+
+
+def site_boards(news_items: List[Dict], github_items: List[Dict], enriched: Dict) -> Dict[str, List[Dict]]:
+    """站点上展示的全部榜单：HN AI 新闻、GitHub 趋势和 enriched 里的各个榜单"""
+    boards = {'hacker_news': news_items, 'github': github_items}
+    boards.update(enriched_boards(enriched))
+    return boards
+
+
+def heat_value(item: Dict):
+    """条目的原始热度字段 (字符串或数字)，没有则返回 None"""
+    for field in HEAT_FIELDS:
+        if item.get(field) not in (None, ''):
+            return item[field]
+    return None
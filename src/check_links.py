@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Link health check before render
+渲染前检查榜单里的外链：占位链接和死链在页面上显示为不可点击
+
+- 占位链接 ('#'、非 http 链接、fallback 数据用的 https://weibo.com 这类站点首页) 不发请求，直接标记；
+  其它只有域名的链接 (比如 Show HN 指向的产品首页) 按正常链接检查
+- 其余链接并发 HEAD，HEAD 不被支持或出错时退回 GET (只读响应头)；
+  每个主机的速率由 http_client 的令牌桶控制
+- 结果缓存在 data/cache/links.json，只有新链接或过期的结果才会重新检查
+
+条目上写入 link_status = 'placeholder' | 'broken'，正常链接不写。
+只有 404 / 410 算死链；被反爬拦截 (401/403/429) 视为正常，5xx 和网络错误记为 unknown，下次再查。
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from boards import site_boards
+from http_client import get as http_get, head as http_head
+from profiling import run_profiled, stage
+from rank_diff import normalize_url
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'links.json')
+
+LINK_TIMEOUT = float(os.environ.get('LINK_CHECK_TIMEOUT', '8'))
+LINK_BUDGET = float(os.environ.get('LINK_CHECK_BUDGET', '30'))
+LINK_WORKERS = int(os.environ.get('LINK_CHECK_WORKERS', '16'))
+
+# 结果有效期：正常 7 天，死链 1 天 (可能恢复)，unknown 6 小时
+CACHE_TTL = {'ok': 7 * 86400, 'broken': 86400, 'unknown': 6 * 3600}
+
+BROKEN_STATUS = {404, 410}
+# 这些状态说明服务器在但拒绝了爬虫，浏览器里通常能打开
+BLOCKED_STATUS = {401, 403, 429, 999}
+# HEAD 得到这些状态时再用 GET 确认
+HEAD_FALLBACK_STATUS = {400, 403, 404, 405, 429, 501}
+
+_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; AINewsStation/1.0)'}
+
+# 各抓取脚本写死的 fallback 数据链到这些站点的首页
+FALLBACK_HOSTS = {'weibo.com', 'zhihu.com', 'bilibili.com', 'youtube.com'}
+
+
+def is_placeholder(url: Optional[str]) -> bool:
+    """'#'、空链接、非 http 链接和 fallback 站点的首页都不指向具体条目"""
+    if not url or urlsplit(url.strip()).scheme not in ('http', 'https'):
+        return True
+    if normalize_url(url) is not None:
+        return False
+    host = (urlsplit(url.strip()).hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host in FALLBACK_HOSTS
+
+
+def classify(code: int) -> str:
+    if code < 400 or code in BLOCKED_STATUS:
+        return 'ok'
+    if code in BROKEN_STATUS:
+        return 'broken'
+    return 'unknown'
+
+
+def probe(url: str) -> Dict:
+    """HEAD，必要时 GET；返回 {'status': ok|broken|unknown, 'code': int|None}"""
+    code = None
+    try:
+        response = http_head(url, timeout=LINK_TIMEOUT, retries=0, allow_redirects=True, headers=_HEADERS)
+        code = response.status_code
+    except Exception:
+        pass
+    if code is None or code in HEAD_FALLBACK_STATUS:
+        try:
+            response = http_get(url, timeout=LINK_TIMEOUT, retries=0, stream=True, headers=_HEADERS)
+            response.close()
+            code = response.status_code
+        except Exception as e:
+            if code is None:
+                return {'status': 'unknown', 'code': None, 'error': e.__class__.__name__}
+    return {'status': classify(code), 'code': code}
+
+
+def load_cache(path: str = CACHE_PATH) -> Dict[str, Dict]:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable link cache: {e}")
+    return {}
+
+
+def save_cache(cache: Dict[str, Dict], path: str = CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def check_links(items: List[Dict]) -> int:
+    """给条目写入 link_status，只检查缓存中没有或已过期的链接，返回本次检查的数量"""
+    cache = load_cache()
+    now = time.time()
+
+    def stale(url):
+        entry = cache.get(url)
+        return entry is None or now - entry.get('checked_at', 0) >= CACHE_TTL.get(entry.get('status'), 0)
+
+    urls = sorted({item['url'] for item in items if not is_placeholder(item.get('url')) and stale(item['url'])})
+    if urls:
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=LINK_WORKERS)
+        futures = {pool.submit(probe, url): url for url in urls}
+        done, not_done = wait(futures, timeout=LINK_BUDGET)
+        pool.shutdown(wait=False, cancel_futures=True)
+        for future in done:
+            cache[futures[future]] = dict(future.result(), checked_at=now)
+        counts = {status: sum(cache[futures[f]]['status'] == status for f in done) for status in CACHE_TTL}
+        print(f"🔗 Checked {len(done)}/{len(urls)} links in {time.monotonic() - start:.1f}s"
+              f" ({counts['ok']} ok, {counts['broken']} broken, {counts['unknown']} unknown,"
+              f" {len(not_done)} over budget)")
+        # 不再出现在榜单里的链接过期后从缓存移除
+        for url in [url for url, entry in cache.items() if now - entry.get('checked_at', 0) >= 30 * 86400]:
+            del cache[url]
+        save_cache(cache)
+
+    apply_link_status(items, cache)
+    return len(urls)
+
+
+def apply_link_status(items: List[Dict], cache: Optional[Dict[str, Dict]] = None):
+    """按占位规则和缓存里的检查结果写 link_status，不发请求 (generate_site 渲染前调用)"""
+    cache = load_cache() if cache is None else cache
+    for item in items:
+        url = item.get('url')
+        if is_placeholder(url):
+            item['link_status'] = 'placeholder'
+        elif cache.get(url, {}).get('status') == 'broken':
+            item['link_status'] = 'broken'
+        else:
+            item.pop('link_status', None)
+
+
+def main():
+    news_path = os.path.join(BASE_DIR, 'data', 'news.json')
+    github_path = os.path.join(BASE_DIR, 'data', 'github.json')
+    enriched_path = os.path.join(BASE_DIR, 'data', 'enriched_trending.json')
+
+    with stage('load'):
+        with open(news_path, 'r', encoding='utf-8') as f:
+            news_data = json.load(f)
+        with open(github_path, 'r', encoding='utf-8') as f:
+            github_items = json.load(f)
+        with open(enriched_path, 'r', encoding='utf-8') as f:
+            enriched = json.load(f)
+
+    boards = site_boards(news_data.get('news', []), github_items, enriched)
+    items = [item for board in boards.values() for item in board]
+    with stage('check'):
+        check_links(items)
+    flagged = sum('link_status' in item for item in items)
+
+    with stage('save'):
+        with open(news_path, 'w', encoding='utf-8') as f:
+            json.dump(news_data, f, indent=2, ensure_ascii=False)
+        with open(github_path, 'w', encoding='utf-8') as f:
+            json.dump(github_items, f, indent=2, ensure_ascii=False)
+        with open(enriched_path, 'w', encoding='utf-8') as f:
+            json.dump(enriched, f, ensure_ascii=False, indent=2)
+    print(f"📁 {flagged}/{len(items)} links flagged as placeholder or broken")
+
+
+if __name__ == "__main__":
+    run_profiled('check_links', main)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+DailyHotApi client with multiple mirrors
+多镜像 DailyHotApi 客户端：按延迟选最快的健康镜像，超过 p95 时对冲请求第二个镜像
+
+镜像列表通过环境变量配置 (逗号分隔)：
+    DAILYHOT_API_MIRRORS="http://43.160.204.149:8080,http://backup.example.com:6688"
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+
+from http_client import get as http_get
+from stream_json import json_prefix
+
+# 默认 (原来唯一的) 自托管服务地址
+DAILYHOT_API_BASE = "http://43.160.204.149:8080"
+
+DAILYHOT_API_MIRRORS = [
+    base.strip().rstrip('/')
+    for base in os.environ.get('DAILYHOT_API_MIRRORS', DAILYHOT_API_BASE).split(',')
+    if base.strip()
+]
+
+# 样本不足时使用的对冲等待时间 (秒)
+HEDGE_DEFAULT_DELAY = float(os.environ.get('DAILYHOT_HEDGE_DELAY', '2.0'))
+# 至少积累这么多样本才用真实 p95
+MIN_SAMPLES = 5
+# 失败后镜像被标记为不健康的冷却时间 (秒)，连续失败会翻倍
+FAILURE_COOLDOWN = 30.0
+FAILURE_COOLDOWN_MAX = 600.0
+
+
+class Mirror:
+    """单个镜像的延迟样本和健康状态"""
+
+    def __init__(self, base: str):
+        self.base = base
+        self.latencies = deque(maxlen=50)
+        self.failures = 0
+        self.down_until = 0.0
+        self.lock = threading.Lock()
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def p50(self) -> float:
+        with self.lock:
+            samples = sorted(self.latencies)
+        return samples[len(samples) // 2] if samples else HEDGE_DEFAULT_DELAY
+
+    def p95(self) -> float:
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def record_success(self, latency: float):
+        with self.lock:
+            self.latencies.append(latency)
+            self.failures = 0
+            self.down_until = 0.0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            cooldown = min(FAILURE_COOLDOWN * (2 ** (self.failures - 1)), FAILURE_COOLDOWN_MAX)
+            self.down_until = time.monotonic() + cooldown
+
+
+class MirrorPool:
+    def __init__(self, bases: List[str]):
+        self.mirrors = [Mirror(base) for base in bases]
+        self.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='dailyhot')
+
+    def ranked(self) -> List[Mirror]:
+        """健康的镜像按中位延迟排序在前，不健康的排在最后作为兜底"""
+        healthy = sorted((m for m in self.mirrors if m.healthy()), key=Mirror.p50)
+        down = sorted((m for m in self.mirrors if not m.healthy()), key=lambda m: m.down_until)
+        return healthy + down
+
+    def _request(self, mirror: Mirror, path: str, timeout: float, limit: Optional[int]) -> Dict:
+        start = time.monotonic()
+        try:
+            response = http_get(f"{mirror.base}/{path.lstrip('/')}", timeout=timeout, stream=True)
+            response.raise_for_status()
+            # 只解码前 limit 条 data，剩余部分不再读取
+            data = json_prefix(response, key='data', limit=limit)
+        except Exception:
+            mirror.record_failure()
+            raise
+        mirror.record_success(time.monotonic() - start)
+        return data
+
+    def get_json(self, path: str, limit: Optional[int] = None, timeout: float = 15) -> Dict:
+        """
+        请求最快的镜像；若超过它的 p95 还没返回，再向第二个镜像发对冲请求，
+        谁先成功用谁。所有镜像都失败时抛出最后一个异常。
+        """
+        candidates = self.ranked()
+        primary = candidates[0]
+        pending = {self.executor.submit(self._request, primary, path, timeout, limit): primary}
+        backups = candidates[1:]
+        hedge_delay = primary.p95()
+        last_error = None
+
+        while pending:
+            done, _ = wait(pending, timeout=hedge_delay if backups else None, return_when=FIRST_COMPLETED)
+            if not done:
+                # 超过 p95：对冲请求下一个镜像
+                mirror = backups.pop(0)
+                print(f"⏱️  DailyHotApi /{path} slow on {primary.base}, hedging to {mirror.base}")
+                pending[self.executor.submit(self._request, mirror, path, timeout, limit)] = mirror
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+            # 已发出的请求都失败了，立即尝试下一个镜像
+            if not pending and backups:
+                mirror = backups.pop(0)
+                pending[self.executor.submit(self._request, mirror, path, timeout, limit)] = mirror
+
+        raise last_error
+
+
+_pool = MirrorPool(DAILYHOT_API_MIRRORS)
+
+
+def fetch_board(path: str, limit: Optional[int] = None, timeout: float = 15) -> Dict:
+    """获取 DailyHotApi 某个榜单的 JSON (例如 'zhihu', '36kr')，data 最多保留 limit 条"""
+    return _pool.get_json(path, limit=limit, timeout=timeout)
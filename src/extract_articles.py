@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Article content extraction for news cards
+并发下载 HN / 36氪 / IT之家 链接的正文页，抽取标题、导语、og:image 和发布时间
+
+- 每个页面最多读取 EXTRACT_MAX_BYTES 字节，单页超时 EXTRACT_TIMEOUT 秒
+- 整个阶段最多 EXTRACT_BUDGET 秒，超时没完成的下次再抓
+- 只解析 <head> 和正文开头的 title/meta/p/time 标签 (SoupStrainer)，有 lxml 就用 lxml
+- 结果按 URL 缓存在 data/cache/articles.json
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from boards import enriched_boards
+from http_client import get as http_get
+from profiling import run_profiled, stage
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'articles.json')
+
+EXTRACT_MAX_BYTES = int(os.environ.get('EXTRACT_MAX_BYTES', str(512 * 1024)))
+EXTRACT_TIMEOUT = float(os.environ.get('EXTRACT_TIMEOUT', '8'))
+EXTRACT_BUDGET = float(os.environ.get('EXTRACT_BUDGET', '30'))
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS', '16'))
+# </head> 之后只解析这么多字节找导语，避免超长正文拖慢解析
+LEAD_WINDOW = 64 * 1024
+
+# 成功结果保留 30 天，失败 1 天后重试
+CACHE_TTL = 30 * 86400
+FAILURE_TTL = 86400
+
+# enriched 榜单里需要预览的站点
+PREVIEW_HOSTS = ('36kr.com', 'ithome.com')
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+_STRAINER = SoupStrainer(['title', 'meta', 'p', 'time'])
+_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; AINewsStation/1.0)'}
+
+
+def _meta(soup, *names) -> Optional[str]:
+    for name in names:
+        tag = soup.find('meta', attrs={'property': name}) or soup.find('meta', attrs={'name': name}) \
+            or soup.find('meta', attrs={'itemprop': name})
+        if tag and tag.get('content'):
+            return tag['content'].strip()
+    return None
+
+
+def parse_article(html: bytes, url: str) -> Dict:
+    """从 HTML 抽取 title / lead / image / published"""
+    head_end = html.find(b'</head>')
+    html = html[:max(head_end, 0) + LEAD_WINDOW]
+    soup = BeautifulSoup(html, PARSER, parse_only=_STRAINER)
+
+    title = _meta(soup, 'og:title', 'twitter:title')
+    if not title and soup.title and soup.title.string:
+        title = soup.title.string.strip()
+
+    lead = _meta(soup, 'og:description', 'description', 'twitter:description')
+    if not lead:
+        for p in soup.find_all('p', limit=30):
+            text = p.get_text(' ', strip=True)
+            if len(text) >= 40:
+                lead = text
+                break
+
+    image = _meta(soup, 'og:image', 'og:image:url', 'twitter:image')
+    published = _meta(soup, 'article:published_time', 'og:published_time', 'datePublished', 'pubdate')
+    if not published:
+        tag = soup.find('time', attrs={'datetime': True})
+        published = tag['datetime'] if tag else None
+
+    return {
+        'title': title,
+        'lead': lead[:300] if lead else None,
+        'image': urljoin(url, image) if image else None,
+        'published': published,
+    }
+
+
+def fetch_article(url: str) -> Dict:
+    """下载页面 (最多 EXTRACT_MAX_BYTES) 并解析；失败返回 {'error': ...}"""
+    try:
+        response = http_get(url, timeout=EXTRACT_TIMEOUT, stream=True, headers=_HEADERS, retries=1)
+        try:
+            if response.status_code != 200:
+                return {'error': f"HTTP {response.status_code}"}
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                return {'error': f"not html: {response.headers.get('Content-Type')}"}
+            body = bytearray()
+            deadline = time.monotonic() + EXTRACT_TIMEOUT
+            for chunk in response.iter_content(chunk_size=16384):
+                body += chunk
+                if len(body) >= EXTRACT_MAX_BYTES or time.monotonic() > deadline:
+                    break
+        finally:
+            response.close()
+        with stage('parse'):
+            return parse_article(bytes(body[:EXTRACT_MAX_BYTES]), url)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _previewable(url: str) -> bool:
+    parts = urlsplit(url or '')
+    return parts.scheme in ('http', 'https') and bool(parts.path.strip('/'))
+
+
+def load_cache(path: str = CACHE_PATH) -> Dict[str, Dict]:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable article cache: {e}")
+    return {}
+
+
+def save_cache(cache: Dict[str, Dict], path: str = CACHE_PATH):
+    now = time.time()
+    cache = {url: entry for url, entry in cache.items() if now - entry.get('fetched_at', 0) < CACHE_TTL}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def extract_previews(items: List[Dict]) -> int:
+    """给条目写入 preview 字段，只下载缓存中没有或已过期的 URL，返回下载数量"""
+    cache = load_cache()
+    now = time.time()
+
+    def stale(url):
+        entry = cache.get(url)
+        if entry is None:
+            return True
+        ttl = FAILURE_TTL if 'error' in entry else CACHE_TTL
+        return now - entry.get('fetched_at', 0) >= ttl
+
+    urls = sorted({item['url'] for item in items if _previewable(item.get('url')) and stale(item['url'])})
+    if urls:
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS)
+        futures = {pool.submit(fetch_article, url): url for url in urls}
+        done, not_done = wait(futures, timeout=EXTRACT_BUDGET)
+        pool.shutdown(wait=False, cancel_futures=True)
+        for future in done:
+            cache[futures[future]] = dict(future.result(), fetched_at=now)
+        failed = sum('error' in cache[futures[f]] for f in done)
+        print(f"📰 Extracted {len(done) - failed}/{len(urls)} articles in {time.monotonic() - start:.1f}s"
+              f" ({failed} failed, {len(not_done)} over budget)")
+        save_cache(cache)
+
+    for item in items:
+        entry = cache.get(item.get('url'))
+        if entry and 'error' not in entry:
+            item['preview'] = {k: entry[k] for k in ('title', 'lead', 'image', 'published') if entry.get(k)}
+    return len(urls)
+
+
+def main():
+    news_path = os.path.join(BASE_DIR, 'data', 'news.json')
+    enriched_path = os.path.join(BASE_DIR, 'data', 'enriched_trending.json')
+
+    with stage('load'):
+        with open(news_path, 'r', encoding='utf-8') as f:
+            news_data = json.load(f)
+        with open(enriched_path, 'r', encoding='utf-8') as f:
+            enriched = json.load(f)
+
+    items = list(news_data.get('news', []))
+    for board in enriched_boards(enriched).values():
+        items.extend(item for item in board if any(host in (item.get('url') or '') for host in PREVIEW_HOSTS))
+
+    with stage('extract'):
+        extract_previews(items)
+
+    with stage('save'):
+        with open(news_path, 'w', encoding='utf-8') as f:
+            json.dump(news_data, f, indent=2, ensure_ascii=False)
+        with open(enriched_path, 'w', encoding='utf-8') as f:
+            json.dump(enriched, f, ensure_ascii=False, indent=2)
+    print(f"📁 Previews written to {news_path} and {enriched_path}")
+
+
+if __name__ == "__main__":
+    run_profiled('extract_articles', main)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+RSS / Atom / JSON Feed outputs per board
+为每个榜单和全站生成 RSS 2.0、Atom 和 JSON Feed
+
+    dist/feeds/<board>.xml   (RSS)
+    dist/feeds/<board>.atom
+    dist/feeds/<board>.json  (JSON Feed 1.1，同时作为下次增量生成的状态)
+    dist/feeds/all.*         全站合并
+
+增量生成：上一次的 JSON Feed 里保存了每个条目的 GUID 和首次出现时间，
+本次只给新 GUID 的条目打时间戳并放到最前面，窗口最多 FEED_WINDOW 条
+(窗口外出现过的 GUID 记在 _ai_news_station.seen 扩展字段里)；
+没有新条目的 feed 不重写，文件和 ETag 保持不变，阅读器的条件请求直接 304。
+
+占位链接 (写死的 fallback 数据) 和死链条目 (load_context 标记的 link_status) 不进 feed，
+之前已经发布过的同一 GUID 也从窗口里撤下。
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from boards import BOARD_TITLES, heat_value
+from rank_diff import item_key
+
+SITE_URL = os.environ.get('SITE_URL', 'https://polarbearlin.github.io/ai-news-station').rstrip('/')
+FEED_WINDOW = int(os.environ.get('FEED_WINDOW', '50'))
+# 记录最近出现过的 GUID 数量 (窗口外的条目不会被重复推送)
+SEEN_LIMIT = 2000
+FEED_NAME = 'AI 资讯站 (AI News Station)'
+
+
+def item_guid(board: str, item: Dict) -> str:
+    digest = hashlib.sha1(f"{board}\n{item_key(item)}".encode('utf-8')).hexdigest()[:16]
+    return f"urn:ai-news-station:{board}:{digest}"
+
+
+def _entry(board: str, item: Dict, published: str) -> Dict:
+    url = item.get('url') or ''
+    if not url.startswith(('http://', 'https://')):
+        url = f"{SITE_URL}/"
+    preview = item.get('preview') or {}
+    summary = item.get('summary') or preview.get('lead') or item.get('description')
+    if not summary and heat_value(item) is not None:
+        summary = f"{BOARD_TITLES.get(board, board)} · {heat_value(item)}"
+    entry = {
+        'id': item_guid(board, item),
+        'url': url,
+        'title': item.get('title') or item.get('full_name') or item.get('name') or '',
+        'content_text': summary or '',
+        'date_published': published,
+        'tags': [board],
+    }
+    if preview.get('image'):
+        entry['image'] = preview['image']
+    return entry
+
+
+def _load_previous(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def merge_entries(previous: List[Dict], seen: List[str], fresh: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """
+    新 GUID 放在最前，旧条目保持原样 (包括首次出现时间)
+
+    seen 记录窗口外也出现过的 GUID，避免超出窗口的老条目被当成新条目反复推送。
+    返回 (新条目列表, 更新后的 seen)。
+    """
+    known = set(seen) | {entry['id'] for entry in previous}
+    new_entries = []
+    for entry in fresh:
+        if entry['id'] not in known:
+            known.add(entry['id'])
+            new_entries.append(entry)
+    seen = (seen + [entry['id'] for entry in new_entries])[-SEEN_LIMIT:]
+    return new_entries, seen
+
+
+def _rss(feed: Dict) -> str:
+    items = []
+    for entry in feed['items']:
+        published = format_datetime(datetime.fromisoformat(entry['date_published']))
+        items.append(
+            "    <item>\n"
+            f"      <title>{escape(entry['title'])}</title>\n"
+            f"      <link>{escape(entry['url'])}</link>\n"
+            f"      <guid isPermaLink=\"false\">{escape(entry['id'])}</guid>\n"
+            f"      <pubDate>{published}</pubDate>\n"
+            f"      <description>{escape(entry['content_text'])}</description>\n"
+            "    </item>\n"
+        )
+    updated = format_datetime(datetime.fromisoformat(feed['_updated']))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+        "  <channel>\n"
+        f"    <title>{escape(feed['title'])}</title>\n"
+        f"    <link>{escape(feed['home_page_url'])}</link>\n"
+        f"    <atom:link href={quoteattr(feed['_rss_url'])} rel=\"self\" type=\"application/rss+xml\"/>\n"
+        f"    <description>{escape(feed['description'])}</description>\n"
+        "    <language>zh-CN</language>\n"
+        f"    <lastBuildDate>{updated}</lastBuildDate>\n"
+        + ''.join(items) +
+        "  </channel>\n"
+        "</rss>\n"
+    )
+
+
+def _atom(feed: Dict) -> str:
+    entries = []
+    for entry in feed['items']:
+        entries.append(
+            "  <entry>\n"
+            f"    <id>{escape(entry['id'])}</id>\n"
+            f"    <title>{escape(entry['title'])}</title>\n"
+            f"    <link href={quoteattr(entry['url'])}/>\n"
+            f"    <updated>{entry['date_published']}</updated>\n"
+            f"    <summary>{escape(entry['content_text'])}</summary>\n"
+            "  </entry>\n"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        f"  <id>{escape(feed['feed_url'])}</id>\n"
+        f"  <title>{escape(feed['title'])}</title>\n"
+        f"  <link href={quoteattr(feed['home_page_url'])}/>\n"
+        f"  <link href={quoteattr(feed['_atom_url'])} rel=\"self\"/>\n"
+        f"  <updated>{feed['_updated']}</updated>\n"
+        f"  <author><name>{escape(FEED_NAME)}</name></author>\n"
+        + ''.join(entries) +
+        "</feed>\n"
+    )
+
+
+def write_feed(feed_dir: str, name: str, title: str, fresh: List[Dict], withdrawn: Set[str] = frozenset()) -> bool:
+    """增量生成一个 feed 的三种格式，withdrawn 里的 GUID 从已发布的条目中撤下；返回是否有更新"""
+    json_path = os.path.join(feed_dir, f'{name}.json')
+    previous = _load_previous(json_path)
+    published = previous.get('items', []) if previous else []
+    previous_items = [entry for entry in published if entry['id'] not in withdrawn]
+    previous_seen = previous.get('_ai_news_station', {}).get('seen', []) if previous else []
+    new_entries, seen = merge_entries(previous_items, previous_seen, fresh)
+    if previous is not None and not new_entries and len(previous_items) == len(published):
+        return False
+    entries = (new_entries + previous_items)[:FEED_WINDOW]
+
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': f"{title} - {FEED_NAME}",
+        'home_page_url': f"{SITE_URL}/",
+        'feed_url': f"{SITE_URL}/feeds/{name}.json",
+        'description': f"{title}，由 AI 资讯站自动更新",
+        'language': 'zh-CN',
+        'items': entries,
+        '_ai_news_station': {'seen': seen},
+    }
+    extras = {
+        '_updated': max(entry['date_published'] for entry in entries) if entries else
+        datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        '_rss_url': f"{SITE_URL}/feeds/{name}.xml",
+        '_atom_url': f"{SITE_URL}/feeds/{name}.atom",
+    }
+
+    os.makedirs(feed_dir, exist_ok=True)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(feed, f, ensure_ascii=False, indent=1)
+    with open(os.path.join(feed_dir, f'{name}.xml'), 'w', encoding='utf-8') as f:
+        f.write(_rss(dict(feed, **extras)))
+    with open(os.path.join(feed_dir, f'{name}.atom'), 'w', encoding='utf-8') as f:
+        f.write(_atom(dict(feed, **extras)))
+    return True
+
+
+def publish_feeds(boards: Dict[str, List[Dict]], output_dir: str) -> int:
+    """生成每个榜单的 feed 和合并的 all feed，返回有更新的 feed 数"""
+    feed_dir = os.path.join(output_dir, 'feeds')
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    updated = 0
+    combined = []
+    withdrawn = set()
+    for board, items in boards.items():
+        fresh = [_entry(board, item, now) for item in items if not item.get('link_status')]
+        flagged = {item_guid(board, item) for item in items if item.get('link_status')}
+        withdrawn |= flagged
+        combined.extend(fresh)
+        updated += write_feed(feed_dir, board, BOARD_TITLES.get(board, board), fresh, flagged)
+    updated += write_feed(feed_dir, 'all', '全部榜单', combined, withdrawn)
+    print(f"📡 Feeds: {updated}/{len(boards) + 1} updated in {feed_dir}")
+    return updated
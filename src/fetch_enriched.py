@@ -5,14 +5,52 @@ Enhanced data fetcher for AI News Station
 """
 import os
 import json
-import requests
+import re
+from dailyhot import fetch_board
+from http_client import get as http_get
+from profiling import run_profiled, stage, timed
+from rank_diff import annotate_enriched
+from stream_json import json_prefix
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict
 
+try:
+    from topic_classifier import route_boards
+except ImportError:
+    route_boards = None
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# DailyHotApi 自托管服务地址
-DAILYHOT_API_BASE = "http://43.160.204.149:8080"
+# DailyHotApi 镜像列表见 dailyhot.py (DAILYHOT_API_MIRRORS)
+
+# 榜单筛选关键词 (topic_classifier.py 也用它们生成训练数据)
+AI_KEYWORDS = ['ai', 'chatgpt', 'llm', 'gpt', 'claude', 'gemini', 'openai', 'anthropic', 
+               'machine learning', 'deep learning', '大模型', '人工智能']
+
+ENTERTAINMENT_KEYWORDS = [
+    '明星', '演员', '歌手', '剧', '综', '恋情', '分手', '离婚', '出轨', '瓜', '曝', 
+    '工作室', '回应', '热搜', '路透', '生图', '造型', '同框', '演唱会', '红毯', '盛典', 
+    '大片', '封面', '生日', '庆生', '结婚', '领证', '当爸', '当妈', '产女', '产子', 
+    '绯闻', '塌房', '道歉', '辟谣', '解约', '复出', '首秀', '官宣', '晒', '合照'
+]
+
+GAMING_KEYWORDS = ['游戏', 'Steam', 'PS', 'Xbox', '任天堂', '手游', '电竞', 'LOL', '原神', '王者', '黑神话']
+
+
+def keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """英文关键词不区分大小写、前后不能紧挨字母 ('PS' 不匹配 GPS / HTTPS，'ai' 不匹配 said，
+    PS5 / GPT-4 仍能匹配)；中文关键词按子串匹配"""
+    parts = [rf'(?<![a-z]){re.escape(k)}(?![a-z])' if k.isascii() else re.escape(k) for k in keywords]
+    return re.compile('|'.join(parts), re.IGNORECASE)
+
+
+AI_PATTERN = keyword_pattern(AI_KEYWORDS)
+ENTERTAINMENT_PATTERN = keyword_pattern(ENTERTAINMENT_KEYWORDS)
+GAMING_PATTERN = keyword_pattern(GAMING_KEYWORDS)
+
+# 并发抓取的线程数 (每个主机的实际压力由 http_client 的令牌桶控制)
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', '8'))
 
 # ============================================
 # 国内热搜来源 (使用 DailyHotApi)
@@ -23,9 +61,7 @@ def fetch_weibo_trending() -> List[Dict]:
     # 注：tenapi.cn 已于 2024-11-27 停运，DailyHotApi 微博源也不稳定
     # 改用今日头条热榜作为主要新闻源
     try:
-        url = f"{DAILYHOT_API_BASE}/toutiao"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('toutiao', limit=15)
         
         if data.get('code') == 200:
             return [{
@@ -42,9 +78,7 @@ def fetch_weibo_trending() -> List[Dict]:
 def fetch_zhihu_trending() -> List[Dict]:
     """知乎热榜 (via DailyHotApi)"""
     try:
-        url = f"{DAILYHOT_API_BASE}/zhihu"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('zhihu', limit=10)
         
         if data.get('code') == 200:
             return [{
@@ -60,9 +94,7 @@ def fetch_zhihu_trending() -> List[Dict]:
 def fetch_bilibili_trending() -> List[Dict]:
     """B站热门视频 (via DailyHotApi)"""
     try:
-        url = f"{DAILYHOT_API_BASE}/bilibili"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('bilibili', limit=10)
         
         if data.get('code') == 200:
             return [{
@@ -78,9 +110,7 @@ def fetch_bilibili_trending() -> List[Dict]:
 def fetch_douyin_trending() -> List[Dict]:
     """抖音热榜 (via DailyHotApi)"""
     try:
-        url = f"{DAILYHOT_API_BASE}/douyin"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('douyin', limit=10)
         
         if data.get('code') == 200:
             return [{
@@ -100,9 +130,7 @@ def fetch_douyin_trending() -> List[Dict]:
 def fetch_producthunt_ai() -> List[Dict]:
     """AI/科技热榜 (via DailyHotApi - 36氪)"""
     try:
-        url = f"{DAILYHOT_API_BASE}/36kr"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('36kr', limit=8)
         
         if data.get('code') == 200:
             return [{
@@ -125,8 +153,8 @@ def fetch_huggingface_trending() -> List[Dict]:
     """HuggingFace热门模型"""
     try:
         url = "https://huggingface.co/api/trending"
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        response = http_get(url, timeout=10, stream=True)
+        data = json_prefix(response, limit=8)
         
         return [{
             'title': f"{item.get('author', 'Unknown')}/{item.get('modelId', 'Model')}",
@@ -154,13 +182,9 @@ def fetch_ai_news_aggregated() -> List[Dict]:
                 all_news = json.load(f)
             
             # 筛选AI关键词
-            ai_keywords = ['ai', 'chatgpt', 'llm', 'gpt', 'claude', 'gemini', 'openai', 'anthropic', 
-                          'machine learning', 'deep learning', '大模型', '人工智能']
-            
             ai_news = []
             for item in all_news:
-                title_lower = item.get('title', '').lower()
-                if any(keyword in title_lower for keyword in ai_keywords):
+                if AI_PATTERN.search(item.get('title', '')):
                     ai_news.append({
                         'title': item.get('title'),
                         'url': item.get('url'),
@@ -181,18 +205,9 @@ def fetch_entertainment_trending() -> List[Dict]:
     """娱乐八卦热搜 (via DailyHotApi - 抖音热榜筛选娱乐内容)"""
     print("⭐ Fetching entertainment/gossip trending...")
     
-    entertainment_keywords = [
-        '明星', '演员', '歌手', '剧', '综', '恋情', '分手', '离婚', '出轨', '瓜', '曝', 
-        '工作室', '回应', '热搜', '路透', '生图', '造型', '同框', '演唱会', '红毯', '盛典', 
-        '大片', '封面', '生日', '庆生', '结婚', '领证', '当爸', '当妈', '产女', '产子', 
-        '绯闻', '塌房', '道歉', '辟谣', '解约', '复出', '首秀', '官宣', '晒', '合照'
-    ]
-    
     try:
         # 使用 DailyHotApi 抖音热榜
-        url = f"{DAILYHOT_API_BASE}/douyin"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('douyin')
         
         if data.get('code') == 200:
             all_items = data.get('data', [])
@@ -201,7 +216,7 @@ def fetch_entertainment_trending() -> List[Dict]:
             # 1. 筛选娱乐相关关键词
             for item in all_items:
                 title = item.get('title', '')
-                if any(k in title for k in entertainment_keywords):
+                if ENTERTAINMENT_PATTERN.search(title):
                     filtered_items.append({
                         'title': title,
                         'url': item.get('url', '#'),
@@ -210,6 +225,7 @@ def fetch_entertainment_trending() -> List[Dict]:
                     })
             
             # 2. 如果筛选结果不足10条，用Top热搜补齐
+            #    (标记为 filler，build_enriched 会优先用分类器路由来的娱乐条目替换)
             if len(filtered_items) < 10:
                 existing_titles = {i['title'] for i in filtered_items}
                 for item in all_items:
@@ -221,7 +237,8 @@ def fetch_entertainment_trending() -> List[Dict]:
                             'title': title,
                             'url': item.get('url', '#'),
                             'hot': str(item.get('hot', '')),
-                            'source': 'entertainment'
+                            'source': 'entertainment',
+                            'filler': True
                         })
             
             return filtered_items[:12]
@@ -273,9 +290,7 @@ def fetch_gaming_trending() -> List[Dict]:
     
     # 1. 英雄联盟官方更新
     try:
-        url = f"{DAILYHOT_API_BASE}/lol"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('lol', limit=5)
         
         if data.get('code') == 200:
             for item in data.get('data', [])[:5]:
@@ -290,15 +305,12 @@ def fetch_gaming_trending() -> List[Dict]:
     
     # 2. IT之家筛选游戏相关
     try:
-        url = f"{DAILYHOT_API_BASE}/ithome"
-        response = requests.get(url, timeout=15)
-        data = response.json()
+        data = fetch_board('ithome')
         
         if data.get('code') == 200:
-            gaming_keywords = ['游戏', 'Steam', 'PS', 'Xbox', '任天堂', '手游', '电竞', 'LOL', '原神', '王者', '黑神话']
             for item in data.get('data', []):
                 title = item.get('title', '')
-                if any(k in title for k in gaming_keywords):
+                if GAMING_PATTERN.search(title):
                     gaming_items.append({
                         'title': title,
                         'url': item.get('url', '#'),
@@ -321,17 +333,40 @@ def fetch_gaming_trending() -> List[Dict]:
         {'title': 'LOL世界赛决赛战况激烈', 'url': '#', 'hot': '4230万', 'source': 'gaming'},
     ]
 
-def main():
-    print("=" * 60)
-    print("🚀 Fetching enriched content for AI News Station...")
-    print("=" * 60)
+# 需要联网抓取的榜单 (名称, 函数)，main() 并发执行，shard_fetch.py 按名称分片
+FETCHERS = [
+    ('weibo', fetch_weibo_trending),
+    ('zhihu', fetch_zhihu_trending),
+    ('bilibili', fetch_bilibili_trending),
+    ('producthunt', fetch_producthunt_ai),
+    ('huggingface', fetch_huggingface_trending),
+    ('entertainment', fetch_entertainment_trending),
+    ('parenting', fetch_parenting_trending),
+    ('gaming', fetch_gaming_trending),
+]
+
+# 走 DailyHotApi (同一台自托管机器) 的榜单；shard_fetch.py 把它们放在同一个分片，共用一个限速桶
+DAILYHOT_FETCHERS = {'weibo', 'zhihu', 'bilibili', 'producthunt', 'entertainment', 'gaming'}
+
+def fetch_all() -> Dict[str, List[Dict]]:
+    """所有榜单并发抓取，同一主机的请求速率由 http_client 限流"""
+    print("\n📡 Fetching all sources concurrently...")
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        futures = {name: pool.submit(timed(f'fetch.{name}', fn)) for name, fn in FETCHERS}
+        return {name: future.result() for name, future in futures.items()}
+
+def build_enriched(results: Dict[str, List[Dict]], last_updated: str = None) -> Dict:
+    """把各榜单抓取结果组装成 enriched_trending.json 的结构 (含 fallback 数据)"""
+    # 分类器把任意来源的娱乐 / 游戏条目路由到对应榜单 (没有 numpy 或模型时跳过)
+    if route_boards is not None:
+        with stage('classify'):
+            results = route_boards(dict(results))
     
     # 国内热搜
-    print("\n📱 Fetching domestic trending...")
     domestic_trending = {
-        'weibo': fetch_weibo_trending(),
-        'zhihu': fetch_zhihu_trending(),
-        'bilibili': fetch_bilibili_trending(),
+        'weibo': results['weibo'],
+        'zhihu': results['zhihu'],
+        'bilibili': results['bilibili'],
     }
     
     # 如果API失败，使用备用数据
@@ -376,10 +411,9 @@ def main():
         ]
     
     # AI专属热搜
-    print("\n🤖 Fetching AI trending...")
     ai_trending = {
-        'producthunt': fetch_producthunt_ai(),
-        'huggingface': fetch_huggingface_trending(),
+        'producthunt': results['producthunt'],
+        'huggingface': results['huggingface'],
         'ai_news': fetch_ai_news_aggregated(),
     }
     
@@ -397,10 +431,9 @@ def main():
     ]
     
     # 新增三大榜单
-    print("\n🎭 Fetching new trending lists...")
-    entertainment_trending = fetch_entertainment_trending()
-    parenting_trending = fetch_parenting_trending()
-    gaming_trending = fetch_gaming_trending()
+    entertainment_trending = results['entertainment']
+    parenting_trending = results['parenting']
+    gaming_trending = results['gaming']
     
     # 合并数据
     enriched_data = {
@@ -410,9 +443,17 @@ def main():
         'entertainment_trending': entertainment_trending,
         'parenting_trending': parenting_trending,
         'gaming_trending': gaming_trending,
-        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'last_updated': last_updated or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'update_interval': '30 minutes'
     }
+    return enriched_data
+
+def save_enriched(enriched_data: Dict):
+    # 标注排名变化 / 新上榜，并更新排名快照
+    annotate_enriched(enriched_data)
+    
+    domestic_trending = enriched_data['domestic_trending']
+    ai_trending = enriched_data['ai_trending']
     
     # 保存数据
     output_path = os.path.join(BASE_DIR, 'data', 'enriched_trending.json')
@@ -433,12 +474,24 @@ def main():
     print(f"      - Product Hunt: {len(ai_trending['producthunt'])}")
     print(f"      - HuggingFace: {len(ai_trending['huggingface'])}")
     print(f"      - AI News: {len(ai_trending['ai_news'])}")
-    print(f"   📺 AI Videos: {len(ai_videos)}")
-    print(f"   🎭 Entertainment: {len(entertainment_trending)}")
-    print(f"   👶 Parenting: {len(parenting_trending)}")
-    print(f"   🎮 Gaming: {len(gaming_trending)}")
+    print(f"   📺 AI Videos: {len(enriched_data['ai_videos'])}")
+    print(f"   🎭 Entertainment: {len(enriched_data['entertainment_trending'])}")
+    print(f"   👶 Parenting: {len(enriched_data['parenting_trending'])}")
+    print(f"   🎮 Gaming: {len(enriched_data['gaming_trending'])}")
     print(f"\n📁 Saved to: {output_path}")
     print("=" * 60)
 
+def main():
+    print("=" * 60)
+    print("🚀 Fetching enriched content for AI News Station...")
+    print("=" * 60)
+    
+    with stage('fetch'):
+        results = fetch_all()
+    with stage('build'):
+        enriched = build_enriched(results)
+    with stage('save'):
+        save_enriched(enriched)
+
 if __name__ == "__main__":
-    main()
+    run_profiled('fetch_enriched', main)
@@ -1,8 +1,11 @@
-import requests
+from http_client import get as http_get
+from profiling import run_profiled, stage
 import json
 import os
 from datetime import datetime, timedelta
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def fetch_github_trends(limit=10):
     """Fetch trending AI repositories from GitHub."""
     print("Fetching GitHub AI trends...")
@@ -24,7 +27,7 @@ def fetch_github_trends(limit=10):
         if os.environ.get("GITHUB_TOKEN"):
              headers["Authorization"] = f"token {os.environ.get('GITHUB_TOKEN')}"
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         
         if response.status_code != 200:
             print(f"GitHub API Error: {response.status_code} - {response.text}")
@@ -49,14 +52,19 @@ def fetch_github_trends(limit=10):
         print(f"Error fetching GitHub trends: {e}")
         return []
 
-def main():
-    repos = fetch_github_trends()
-    
-    os.makedirs('data', exist_ok=True)
-    with open('data/github.json', 'w') as f:
+def save_repos(repos):
+    output_path = os.path.join(BASE_DIR, 'data', 'github.json')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
         json.dump(repos, f, indent=2, ensure_ascii=False)
     
     print(f"Saved {len(repos)} repos to data/github.json")
 
+def main():
+    with stage('fetch'):
+        repos = fetch_github_trends()
+    with stage('save'):
+        save_repos(repos)
+
 if __name__ == "__main__":
-    main()
+    run_profiled('fetch_github', main)
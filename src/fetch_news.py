@@ -1,68 +1,85 @@
-import requests
+from http_client import get as http_get
+from profiling import run_profiled, stage
+from stream_json import json_prefix
 import json
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def fetch_hacker_news_ai(limit=20):
     """Fetch AI-related stories from Hacker News."""
     print("Fetching Hacker News AI stories...")
     # HN API top stories
     try:
         top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        top_ids = requests.get(top_stories_url, timeout=10).json()
+        # We might need to scan more to find AI topics
+        scan_limit = 10 
+        
+        # topstories.json lists ~500 ids; only decode the ones we will scan
+        top_ids = json_prefix(http_get(top_stories_url, timeout=10, stream=True), limit=scan_limit)
         
         ai_keywords = ['ai', 'gpt', 'llm', 'machine learning', 'diffusion', 'transformer', 'neural', 'deepseek', 'openai', 'anthropic']
         
         stories = []
         count = 0
         
-        # We might need to scan more to find AI topics
-        scan_limit = 10 
-        
-        for item_id in top_ids[:scan_limit]:
-            if count >= limit:
-                break
-                
+        def fetch_item(item_id):
             item_url = f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json"
             try:
-                item = requests.get(item_url, timeout=10).json()
-                if not item or 'title' not in item or 'url' not in item:
-                    continue
-                
-                title = item['title'].lower()
-                if any(kw in title for kw in ai_keywords):
-                    stories.append({
-                        'title': item['title'],
-                        'url': item.get('url', f"https://news.ycombinator.com/item?id={item_id}"),
-                        'source': 'Hacker News',
-                        'time': datetime.fromtimestamp(item.get('time', 0)).strftime('%Y-%m-%d %H:%M'),
-                        'score': item.get('score', 0),
-                        'comments': item.get('descendants', 0)
-                    })
-                    count += 1
+                return http_get(item_url, timeout=10).json()
             except Exception as e:
                 print(f"Error fetching item {item_id}: {e}")
+                return None
+        
+        # Items are fetched concurrently; http_client keeps HN under its rate limit
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            items = list(pool.map(fetch_item, top_ids[:scan_limit]))
+        
+        for item_id, item in zip(top_ids[:scan_limit], items):
+            if count >= limit:
+                break
+            if not item or 'title' not in item or 'url' not in item:
+                continue
+            
+            title = item['title'].lower()
+            if any(kw in title for kw in ai_keywords):
+                stories.append({
+                    'title': item['title'],
+                    'url': item.get('url', f"https://news.ycombinator.com/item?id={item_id}"),
+                    'source': 'Hacker News',
+                    'time': datetime.fromtimestamp(item.get('time', 0)).strftime('%Y-%m-%d %H:%M'),
+                    'score': item.get('score', 0),
+                    'comments': item.get('descendants', 0)
+                })
+                count += 1
                 
         return stories
     except Exception as e:
         print(f"Error fetching Hacker News: {e}")
         return []
 
-def main():
-    stories = fetch_hacker_news_ai()
-    
+def save_news(stories, generated_at=None):
     # Save to data.json
     output = {
-        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'generated_at': generated_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'news': stories
     }
     
-    os.makedirs('data', exist_ok=True)
-    with open('data/news.json', 'w') as f:
+    output_path = os.path.join(BASE_DIR, 'data', 'news.json')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
     print(f"Saved {len(stories)} stories to data/news.json")
 
+def main():
+    with stage('fetch'):
+        stories = fetch_hacker_news_ai()
+    with stage('save'):
+        save_news(stories)
+
 if __name__ == "__main__":
-    main()
+    run_profiled('fetch_news', main)
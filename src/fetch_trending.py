@@ -5,7 +5,9 @@ Fetch trending topics from multiple Chinese platforms
 """
 import os
 import json
-import requests
+from http_client import get as http_get
+from profiling import run_profiled, stage
+from stream_json import json_prefix
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,9 +19,9 @@ def fetch_weibo_trending():
     try:
         # 使用第三方聚合API - Tenapi (免费)
         url = "https://tenapi.cn/v2/weibohot"
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10, stream=True)
         response.raise_for_status()
-        data = response.json()
+        data = json_prefix(response, limit=20)
         
         if data.get('code') == 200:
             items = data.get('data', [])[:20]  # 取前20条
@@ -40,9 +42,9 @@ def fetch_zhihu_trending():
     """
     try:
         url = "https://tenapi.cn/v2/zhihuhot"
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10, stream=True)
         response.raise_for_status()
-        data = response.json()
+        data = json_prefix(response, limit=15)
         
         if data.get('code') == 200:
             items = data.get('data', [])[:15]
@@ -63,9 +65,9 @@ def fetch_baidu_trending():
     """
     try:
         url = "https://tenapi.cn/v2/baiduhot"
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10, stream=True)
         response.raise_for_status()
-        data = response.json()
+        data = json_prefix(response, limit=15)
         
         if data.get('code') == 200:
             items = data.get('data', [])[:15]
@@ -80,20 +82,13 @@ def fetch_baidu_trending():
     
     return []
 
-def main():
-    print("Fetching trending topics...")
-    
-    # 抓取各平台热搜
-    weibo = fetch_weibo_trending()
-    zhihu = fetch_zhihu_trending()
-    baidu = fetch_baidu_trending()
-    
+def save_trending(weibo, zhihu, baidu, last_updated=None):
     # 合并数据
     trending_data = {
         'weibo': weibo,
         'zhihu': zhihu,
         'baidu': baidu,
-        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        'last_updated': last_updated or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
     # 保存到 data 目录
@@ -104,5 +99,14 @@ def main():
     print(f"✅ Trending data saved: {len(weibo)} Weibo + {len(zhihu)} Zhihu + {len(baidu)} Baidu")
     print(f"📁 Saved to: {output_path}")
 
+def main():
+    print("Fetching trending topics...")
+    
+    # 抓取各平台热搜
+    with stage('fetch'):
+        boards = fetch_weibo_trending(), fetch_zhihu_trending(), fetch_baidu_trending()
+    with stage('save'):
+        save_trending(*boards)
+
 if __name__ == "__main__":
-    main()
+    run_profiled('fetch_trending', main)
@@ -1,8 +1,17 @@
 import json
 import os
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from datetime import datetime
 
+from archive import publish_archive
+from boards import site_boards
+from check_links import apply_link_status
+from feeds import publish_feeds
+from images import process_images
+from profiling import run_profiled, stage
+from service_worker import write_service_worker
+from static_api import publish_api
+
 # Calculate base directory (one level up from src)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -14,13 +23,11 @@ def load_data(filename):
     print(f"Warning: Data file not found at {path}")
     return []
 
-def generate_html():
-    print(f"Generating static site... Base Dir: {BASE_DIR}")
-    
-    # Load data
+def load_context():
+    """Load every data file the index template uses (shared with preview.py)"""
     news_data = load_data('news.json')
     news_items = news_data.get('news', []) if isinstance(news_data, dict) else []
-    
+
     github_items = load_data('github.json')
 
     tools_data = load_data('tools.json')
@@ -31,22 +38,11 @@ def generate_html():
 
     trending_data = load_data('trending.json')
     trending_items = trending_data if isinstance(trending_data, dict) else {}
-    
+
     enriched_data = load_data('enriched_trending.json')
     enriched_trending = enriched_data if isinstance(enriched_data, dict) else {}
-    
-    # Prepare template environment
-    template_dir = os.path.join(BASE_DIR, 'templates')
-    if not os.path.exists(template_dir):
-        print(f"Error: Template directory not found at {template_dir}")
-        return
 
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template('index.html')
-    
-    # Context
     context = {
-        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
         'news_items': news_items,
         'github_items': github_items,
         'tools_items': tools_items,
@@ -54,17 +50,66 @@ def generate_html():
         'trending_items': trending_items,
         'enriched_trending': enriched_trending,
     }
+    boards = site_boards(news_items, github_items, enriched_trending)
+
+    # Placeholder / dead links (cached results of check_links.py) render as plain text
+    apply_link_status([item for board in boards.values() for item in board])
+    return context, boards
+
+def site_environment(template_dir):
+    """Jinja environment for index.html; titles, leads and summaries come from third-party pages, so autoescape"""
+    return Environment(loader=FileSystemLoader(template_dir), autoescape=select_autoescape())
+
+def render_index(env, context, output_dir):
+    """Render templates/index.html into output_dir/index.html"""
+    with stage('render'):
+        html_content = env.get_template('index.html').render(
+            context, last_updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'))
+
+    with stage('write'):
+        with open(os.path.join(output_dir, 'index.html'), 'w') as f:
+            f.write(html_content)
+
+def generate_html():
+    print(f"Generating static site... Base Dir: {BASE_DIR}")
     
-    # Render
-    html_content = template.render(context)
+    # Load data
+    with stage('load'):
+        context, boards = load_context()
     
-    # Output
+    # Prepare template environment
+    template_dir = os.path.join(BASE_DIR, 'templates')
+    if not os.path.exists(template_dir):
+        print(f"Error: Template directory not found at {template_dir}")
+        return
+
     output_dir = os.path.join(BASE_DIR, 'dist')
     os.makedirs(output_dir, exist_ok=True)
-    with open(os.path.join(output_dir, 'index.html'), 'w') as f:
-        f.write(html_content)
+
+    # Local avatars + responsive WebP thumbnails for the showcase (falls back to remote URLs on failure)
+    with stage('images'):
+        process_images(context['showcase_items'], output_dir)
+
+    # Render
+    render_index(site_environment(template_dir), context, output_dir)
         
     print(f"Site generated at {output_dir}/index.html")
 
+    # Static JSON API (per-board documents + latest.json + delta files)
+    with stage('api'):
+        publish_api(boards, output_dir)
+
+    # RSS / Atom / JSON Feed per board, built incrementally from the previous feeds
+    with stage('feeds'):
+        publish_feeds(boards, output_dir)
+
+    # Dated archive pages; only days whose snapshot changed are re-rendered
+    with stage('archive'):
+        publish_archive(boards, output_dir, template_dir)
+
+    # Service worker last, so its precache manifest hashes the final build output
+    with stage('service_worker'):
+        write_service_worker(output_dir, template_dir)
+
 if __name__ == "__main__":
-    generate_html()
+    run_profiled('generate_site', generate_html)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for AI News Station fetchers
+按主机限流 (令牌桶) + 指数退避重试 (带抖动, 遵守 Retry-After)
+
+所有抓取脚本都通过 get() 发请求，这样并发抓取时：
+- 自托管的 DailyHotApi 不会被同时打爆
+- GitHub / HN 的配额按主机统一计算
+- 偶发的网络错误会先重试，而不是立刻退回 fallback 数据
+"""
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from profiling import stage
+
+# 默认每个主机的速率 (请求/秒) 和突发容量
+DEFAULT_RATE = float(os.environ.get('HTTP_RATE_LIMIT', '4'))
+DEFAULT_BURST = float(os.environ.get('HTTP_RATE_BURST', '4'))
+
+# 主机级限制: netloc -> (rate, burst)
+HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    '43.160.204.149:8080': (3, 4),            # DailyHotApi 单机自托管，别打太狠
+    'api.github.com': (0.5, 2),               # search API 30 次/分钟
+    'hacker-news.firebaseio.com': (10, 10),
+    'huggingface.co': (2, 2),
+}
+
+MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '3'))
+BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', '0.5'))
+BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', '30'))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _parse_host_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """解析 HTTP_HOST_LIMITS，例如 "api.github.com=0.5/2,example.com:8080=5/10" """
+    limits = {}
+    for part in spec.split(','):
+        part = part.strip()
+        if not part or '=' not in part:
+            continue
+        host, value = part.rsplit('=', 1)
+        rate, _, burst = value.partition('/')
+        try:
+            limits[host.strip().lower()] = (float(rate), float(burst or rate))
+        except ValueError:
+            print(f"⚠️  Ignoring bad HTTP_HOST_LIMITS entry: {part}")
+    return limits
+
+
+HOST_LIMITS.update(_parse_host_limits(os.environ.get('HTTP_HOST_LIMITS', '')))
+
+
+class TokenBucket:
+    """线程安全的令牌桶，acquire() 会阻塞直到拿到令牌"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """上游要求暂停 (Retry-After / 配额耗尽) 时，整个主机一起等待"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+_local = threading.local()
+
+
+def bucket_for(url: str) -> TokenBucket:
+    host = urlsplit(url).netloc.lower()
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+
+def _session() -> requests.Session:
+    # requests.Session 不保证线程安全，每个线程一个，依然能复用连接
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """读取 Retry-After (秒数或 HTTP 日期) 以及 GitHub 的 X-RateLimit-Reset"""
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+                return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        reset = response.headers.get('X-RateLimit-Reset')
+        if reset and reset.isdigit():
+            return max(int(reset) - time.time(), 0.0)
+    return None
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: 在 [0, base * 2^attempt] 内随机，避免多个线程同时重试
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def get(url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+    """限流 + 重试版的 requests.get (见 request())"""
+    return request('GET', url, retries=retries, **kwargs)
+
+
+def head(url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+    """限流 + 重试版的 requests.head"""
+    return request('HEAD', url, retries=retries, **kwargs)
+
+
+def request(method: str, url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+    """
+    限流 + 重试版的 requests.request
+
+    可重试的状态码重试用尽后返回最后一次响应 (调用方照常检查 status_code)，
+    网络异常重试用尽后抛出最后一次异常。
+    """
+    retries = MAX_RETRIES if retries is None else retries
+    kwargs.setdefault('timeout', 15)
+    bucket = bucket_for(url)
+
+    for attempt in range(retries + 1):
+        with stage('ratelimit'):
+            bucket.acquire()
+        try:
+            with stage('http'):
+                response = _session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+            print(f"⚠️  {e.__class__.__name__} on {url}, retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        rate_limited = response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+        if response.status_code not in RETRY_STATUS and not rate_limited:
+            return response
+        if attempt >= retries:
+            return response
+
+        wait = _retry_after(response)
+        if wait is not None and wait > BACKOFF_MAX:
+            # 配额要很久才恢复，不值得等，直接交给调用方走 fallback
+            print(f"⚠️  {url} rate limited for {wait:.0f}s, giving up")
+            return response
+        delay = _backoff(attempt) if wait is None else wait + random.uniform(0, BACKOFF_BASE)
+        if wait is not None:
+            bucket.block_for(delay)
+        print(f"⚠️  HTTP {response.status_code} on {url}, retry {attempt + 1}/{retries} in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+    return response
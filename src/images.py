@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Build-time image pipeline for the showcase view
+构建时处理展示区图片：本地生成头像，下载展示图并生成多尺寸 WebP 缩略图
+
+    dist/img/avatars/<hash>.webp          本地渲染的首字母头像 (替代 ui-avatars.com)
+    dist/img/showcase/<hash>-<w>.webp     320/640/960 宽的缩略图，配合 srcset 使用
+
+- 下载时带上次的 ETag / Last-Modified 做条件请求，304 或内容哈希不变时直接复用
+- 解码、缩放、编码在进程池里并行
+- 缓存记录在 data/cache/images.json
+"""
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from http_client import get as http_get
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'images.json')
+
+THUMB_WIDTHS = (320, 640, 960)
+THUMB_SIZES = '(max-width: 600px) 50vw, 300px'
+WEBP_QUALITY = 80
+AVATAR_SIZE = 80  # .avatar 显示 40px，按 2x 渲染
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+IMAGE_WORKERS = min(os.cpu_count() or 2, 4)
+
+# 能显示中文首字的字体，按顺序尝试
+FONT_CANDIDATES = (
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/System/Library/Fonts/PingFang.ttc',
+)
+
+
+def _font(size: int):
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def render_avatar(name: str, path: str) -> Dict:
+    """首字母 + 按名字哈希取色的圆形头像"""
+    digest = hashlib.sha1(name.encode('utf-8')).digest()
+    color = (64 + digest[0] % 160, 64 + digest[1] % 160, 64 + digest[2] % 160)
+    image = Image.new('RGBA', (AVATAR_SIZE, AVATAR_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((0, 0, AVATAR_SIZE - 1, AVATAR_SIZE - 1), fill=color)
+    initial = (name.strip()[:1] or '?').upper()
+    draw.text((AVATAR_SIZE / 2, AVATAR_SIZE / 2), initial, fill='white',
+              font=_font(AVATAR_SIZE // 2), anchor='mm')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path, 'WEBP', quality=WEBP_QUALITY)
+    return {'width': AVATAR_SIZE, 'height': AVATAR_SIZE}
+
+
+def make_thumbnails(content: bytes, stem: str) -> Dict:
+    """生成各宽度的 WebP 缩略图 (不放大)，返回 [(相对文件名, 宽, 高)] 和原始宽高"""
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert('RGB')
+        width, height = image.size
+        variants = []
+        for target in THUMB_WIDTHS:
+            if variants and target > width:
+                break
+            w = min(target, width)
+            h = max(1, round(height * w / width))
+            path = f'{stem}-{w}.webp'
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            image.resize((w, h), Image.LANCZOS).save(path, 'WEBP', quality=WEBP_QUALITY, method=4)
+            variants.append((os.path.basename(path), w, h))
+    return {'variants': variants, 'width': width, 'height': height}
+
+
+def load_cache(path: str = CACHE_PATH) -> Dict:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable image cache: {e}")
+    return {}
+
+
+def save_cache(cache: Dict, path: str = CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def _download(url: str, cached: Optional[Dict]) -> Dict:
+    """条件请求下载图片，返回 {'status': 'not_modified' | 'ok' | 'error', ...}"""
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+    try:
+        response = http_get(url, headers=headers, timeout=20, stream=True)
+        try:
+            if response.status_code == 304:
+                return {'status': 'not_modified'}
+            if response.status_code != 200:
+                return {'status': 'error', 'error': f"HTTP {response.status_code}"}
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body += chunk
+                if len(body) > MAX_IMAGE_BYTES:
+                    return {'status': 'error', 'error': 'image too large'}
+            return {'status': 'ok', 'content': bytes(body),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')}
+        finally:
+            response.close()
+    except Exception as e:
+        return {'status': 'error', 'error': str(e)}
+
+
+def _outputs_exist(entry: Dict, img_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(img_dir, 'showcase', name)) for name, _, _ in entry.get('variants', []))
+
+
+def _image_attrs(entry: Dict) -> Dict:
+    variants = entry['variants']
+    largest = variants[-1]
+    return {
+        'src': f"img/showcase/{variants[0][0]}",
+        'srcset': ', '.join(f"img/showcase/{name} {w}w" for name, w, _ in variants),
+        'sizes': THUMB_SIZES,
+        'width': largest[1],
+        'height': largest[2],
+    }
+
+
+def _avatar_filename(name: str) -> str:
+    return f"{hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]}.webp"
+
+
+def apply_cached_images(showcase_items: List[Dict], output_dir: str) -> int:
+    """
+    只用 images.json 和 output_dir 里已经生成的文件给条目加 avatar / image，
+    不下载、不渲染、不写缓存 (preview.py 用)；返回加上本地图片的条目数
+    """
+    img_dir = os.path.join(output_dir, 'img')
+    image_cache = load_cache().get('images', {})
+    applied = 0
+    for item in showcase_items:
+        name = item.get('author') or ''
+        if name and os.path.exists(os.path.join(img_dir, 'avatars', _avatar_filename(name))):
+            item['avatar'] = {'src': f'img/avatars/{_avatar_filename(name)}', 'width': 40, 'height': 40}
+        entry = image_cache.get(item.get('image_url'))
+        if entry and entry.get('variants') and _outputs_exist(entry, img_dir):
+            item['image'] = _image_attrs(entry)
+            applied += 1
+    return applied
+
+
+def process_images(showcase_items: List[Dict], output_dir: str) -> Dict:
+    """
+    给展示条目加上 avatar / image 字段 (本地路径、srcset、固有尺寸)，
+    失败的条目保持原样，模板会退回远程地址。
+    """
+    img_dir = os.path.join(output_dir, 'img')
+    cache = load_cache()
+    image_cache = cache.setdefault('images', {})
+
+    # 1. 头像：名字决定内容，文件已存在就跳过
+    avatar_jobs = {}
+    for item in showcase_items:
+        name = item.get('author') or ''
+        if not name:
+            continue
+        filename = _avatar_filename(name)
+        item['avatar'] = {'src': f'img/avatars/{filename}', 'width': 40, 'height': 40}
+        path = os.path.join(img_dir, 'avatars', filename)
+        if not os.path.exists(path):
+            avatar_jobs[name] = path
+
+    # 2. 展示图：并发条件下载
+    #    输出文件缺失 (比如 dist 被清空) 时不带校验头，强制重新下载
+    urls = sorted({item['image_url'] for item in showcase_items if item.get('image_url')})
+    validators = {url: image_cache[url] for url in urls
+                  if url in image_cache and _outputs_exist(image_cache[url], img_dir)}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        downloads = dict(zip(urls, pool.map(lambda url: _download(url, validators.get(url)), urls)))
+
+    thumb_jobs = {}
+    for url, result in downloads.items():
+        cached = image_cache.get(url)
+        if result['status'] == 'not_modified' and cached and _outputs_exist(cached, img_dir):
+            continue
+        if result['status'] != 'ok':
+            if result['status'] == 'error':
+                print(f"❌ Image download failed {url}: {result['error']}")
+            continue
+        content_hash = hashlib.sha256(result['content']).hexdigest()[:16]
+        if cached and cached.get('sha256') == content_hash and _outputs_exist(cached, img_dir):
+            cached.update(etag=result['etag'], last_modified=result['last_modified'])
+            continue
+        image_cache[url] = {'sha256': content_hash, 'etag': result['etag'],
+                            'last_modified': result['last_modified']}
+        thumb_jobs[url] = (result['content'], os.path.join(img_dir, 'showcase', content_hash))
+
+    # 3. 解码 / 缩放 / 编码放进进程池
+    failed_avatars = set()
+    if avatar_jobs or thumb_jobs:
+        with ProcessPoolExecutor(max_workers=IMAGE_WORKERS) as pool:
+            avatar_futures = {name: pool.submit(render_avatar, name, path) for name, path in avatar_jobs.items()}
+            thumb_futures = {url: pool.submit(make_thumbnails, content, stem)
+                             for url, (content, stem) in thumb_jobs.items()}
+            for name, future in avatar_futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    # 模板退回 ui-avatars.com；写了一半的文件删掉，下次重新渲染
+                    print(f"❌ Avatar rendering failed {name}: {e}")
+                    failed_avatars.add(name)
+                    if os.path.exists(avatar_jobs[name]):
+                        os.remove(avatar_jobs[name])
+            for url, future in thumb_futures.items():
+                try:
+                    image_cache[url].update(future.result())
+                except Exception as e:
+                    print(f"❌ Image processing failed {url}: {e}")
+                    image_cache.pop(url, None)
+
+    # 内容变化后旧哈希的缩略图不再被引用，删掉以免 dist 和预缓存越积越多
+    for url in [url for url in image_cache if url not in downloads]:
+        image_cache.pop(url)
+    referenced = {name for entry in image_cache.values() for name, _, _ in entry.get('variants', [])}
+    showcase_dir = os.path.join(img_dir, 'showcase')
+    if os.path.isdir(showcase_dir):
+        for name in os.listdir(showcase_dir):
+            if name not in referenced:
+                os.remove(os.path.join(showcase_dir, name))
+
+    for item in showcase_items:
+        if item.get('author') in failed_avatars:
+            item.pop('avatar', None)
+        entry = image_cache.get(item.get('image_url'))
+        if entry and entry.get('variants') and _outputs_exist(entry, img_dir):
+            item['image'] = _image_attrs(entry)
+
+    save_cache(cache)
+    print(f"🖼️  Images: {len(avatar_jobs) - len(failed_avatars)} avatars rendered, {len(thumb_jobs)}/{len(urls)} images re-encoded")
+    return cache
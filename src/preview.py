@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Local preview server with live reload
+本地预览：改模板或数据后只重新渲染受影响的页面，浏览器通过 SSE 自动刷新
+
+    python src/preview.py                 在 http://127.0.0.1:8000 预览
+    python src/preview.py --port 9000 --build   先完整跑一遍 generate_site (写 dist/) 再预览
+
+- 页面渲染到 .preview/ (不入库)，不覆盖 dist/ 里已提交的构建结果；
+  请求先找 .preview/，找不到再用 dist/ (图片、api、feeds 等)
+- 轮询 templates/ 和 data/ 的修改时间：
+    templates/index.html、data/*.json         -> 只重新渲染 .preview/index.html
+    templates/archive.html、data/archive/*    -> 只重新渲染有变化的存档日期
+    templates/sw.js                            -> 不处理 (预览用的是下面的占位 service worker)
+  预览时不抓取、不下载图片 (展示图用 data/cache/images.json 和 dist/img 里已有的缩略图)，
+  不写 api / feeds 等增量状态，也不修改 data/
+- 按内容哈希返回 ETag (If-None-Match -> 304)，文本类型按 Accept-Encoding 做 gzip，
+  带 Cache-Control；HTML 响应里注入一段监听 /__reload 的脚本
+- 预览时 /sw.js 返回一个会注销自己的 service worker，避免缓存挡住刷新
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from jinja2 import Environment
+
+from archive import render_archive
+from generate_site import generate_html, load_context, render_index, site_environment
+from images import apply_cached_images
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'dist')
+PREVIEW_DIR = os.path.join(BASE_DIR, '.preview')
+
+POLL_INTERVAL = 0.25
+HEARTBEAT = 15
+# 监视时忽略的目录 (抓取中间结果和缓存不影响页面)
+IGNORED_DIRS = ('shards', 'cache', 'models')
+
+COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                'application/rss+xml', 'application/atom+xml', 'application/feed+json', 'image/svg+xml')
+MIN_GZIP_SIZE = 1024
+
+RELOAD_SCRIPT = (b"<script>new EventSource('/__reload').addEventListener('reload',"
+                 b"function(){location.reload();});</script>")
+PREVIEW_SW = (b"// preview: unregister any service worker left over from a production build\n"
+              b"self.addEventListener('install', () => self.skipWaiting());\n"
+              b"self.addEventListener('activate', (event) => event.waitUntil(self.registration.unregister()));\n")
+
+mimetypes.add_type('application/atom+xml', '.atom')
+mimetypes.add_type('image/webp', '.webp')
+
+
+class Reloader:
+    """记录构建代数，SSE 连接等待代数变化"""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def bump(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation: int, timeout: float) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout=timeout)
+            return self.generation
+
+
+RELOADER = Reloader()
+
+
+# ============================================
+# 增量渲染
+# ============================================
+
+def scan(*roots: str) -> Dict[str, int]:
+    """路径 -> mtime_ns"""
+    mtimes = {}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+    return mtimes
+
+
+def affected_outputs(paths: Set[str]) -> Set[str]:
+    """改动的文件 -> 需要重新生成的输出 ('index' / 'archive')"""
+    targets = set()
+    for path in paths:
+        relative = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+        if relative == 'templates/archive.html' or relative.startswith('data/archive/'):
+            targets.add('archive')
+        elif relative == 'templates/sw.js':
+            continue
+        elif relative.startswith(('templates/', 'data/')):
+            targets.add('index')
+    return targets
+
+
+def rebuild(targets: Set[str], env: Environment):
+    start = time.perf_counter()
+    if 'index' in targets:
+        context, _ = load_context()
+        apply_cached_images(context['showcase_items'], OUTPUT_DIR)
+        render_index(env, context, PREVIEW_DIR)
+    if 'archive' in targets:
+        render_archive(PREVIEW_DIR, TEMPLATE_DIR)
+    print(f"♻️  Rebuilt {', '.join(sorted(targets))} in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def watch(env: Environment):
+    mtimes = scan(TEMPLATE_DIR, DATA_DIR)
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current = scan(TEMPLATE_DIR, DATA_DIR)
+        changed = {path for path in set(mtimes) | set(current) if mtimes.get(path) != current.get(path)}
+        mtimes = current
+        targets = affected_outputs(changed)
+        if not targets:
+            continue
+        try:
+            rebuild(targets, env)
+        except Exception as e:
+            # 模板写到一半时常见语法错误，打印出来等下一次保存
+            print(f"❌ Rebuild failed: {e.__class__.__name__}: {e}")
+            continue
+        RELOADER.bump()
+
+
+# ============================================
+# HTTP
+# ============================================
+
+class _Cache:
+    """(路径, mtime, 大小) -> (原始内容, gzip 内容, ETag)，文件没变就不重复读取和压缩"""
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[Tuple[int, int], bytes, bytes, str]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, path: str, content_type: str) -> Tuple[bytes, bytes, str]:
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry[0] == key:
+            return entry[1], entry[2], entry[3]
+        with open(path, 'rb') as f:
+            body = f.read()
+        if content_type == 'text/html':
+            body = body.replace(b'</body>', RELOAD_SCRIPT + b'</body>', 1)
+        compressed = gzip.compress(body, compresslevel=6) \
+            if content_type.startswith(COMPRESSIBLE) and len(body) >= MIN_GZIP_SIZE else b''
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        with self.lock:
+            self.entries[path] = (key, body, compressed, etag)
+        return body, compressed, etag
+
+
+FILE_CACHE = _Cache()
+
+
+def resolve(relative: str) -> Optional[str]:
+    """先找 .preview/，再找 dist/；越出目录时返回 None，两处都没有时返回 dist/ 下的路径"""
+    for root in (PREVIEW_DIR, OUTPUT_DIR):
+        root = os.path.realpath(root)
+        full_path = os.path.realpath(os.path.join(root, relative))
+        if not full_path.startswith(root + os.sep):
+            return None
+        if os.path.exists(full_path):
+            return full_path
+    return full_path
+
+
+def cache_control(relative: str) -> str:
+    # 带内容哈希的缩略图可以长期缓存，其余都用 ETag 重新验证
+    if relative.startswith('img/showcase/'):
+        return 'public, max-age=31536000, immutable'
+    if relative.startswith('img/'):
+        return 'public, max-age=3600'
+    return 'no-cache'
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    server_version = 'AINewsStationPreview/1.0'
+
+    def do_HEAD(self):
+        self.do_GET(head_only=True)
+
+    def do_GET(self, head_only: bool = False):
+        path = unquote(urlsplit(self.path).path)
+        if path == '/__reload':
+            return self._events()
+        if path == '/sw.js':
+            return self._send(200, PREVIEW_SW, 'application/javascript', {'Cache-Control': 'no-store'}, head_only)
+
+        relative = path.lstrip('/')
+        if relative == '' or relative.endswith('/'):
+            relative += 'index.html'
+        full_path = resolve(relative)
+        if full_path is None:
+            return self._send(403, b'Forbidden', 'text/plain', {}, head_only)
+        if os.path.isdir(full_path):
+            self.send_response(301)
+            self.send_header('Location', path + '/')
+            self.end_headers()
+            return
+        if not os.path.isfile(full_path):
+            return self._send(404, b'Not Found', 'text/plain', {}, head_only)
+
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        body, compressed, etag = FILE_CACHE.get(full_path, content_type)
+        headers = {'ETag': etag, 'Cache-Control': cache_control(relative), 'Vary': 'Accept-Encoding'}
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if compressed and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = compressed
+            headers['Content-Encoding'] = 'gzip'
+        self._send(200, body, content_type, headers, head_only)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict[str, str], head_only: bool):
+        self.send_response(status)
+        if content_type.startswith(('text/', 'application/javascript', 'application/json')):
+            content_type += '; charset=utf-8'
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _events(self):
+        """SSE：构建代数变化时推送 reload 事件，空闲时发心跳保持连接"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        generation = RELOADER.generation
+        try:
+            self.wfile.write(b': connected\n\n')
+            self.wfile.flush()
+            while True:
+                current = RELOADER.wait(generation, HEARTBEAT)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(f'event: reload\ndata: {generation}\n\n'.encode())
+                else:
+                    self.wfile.write(b': ping\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if not self.path.startswith('/__reload'):
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Preview the site with live reload')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--build', action='store_true', help='run the full generate_site build first')
+    args = parser.parse_args()
+
+    env = site_environment(TEMPLATE_DIR)
+    os.makedirs(PREVIEW_DIR, exist_ok=True)
+    if args.build:
+        generate_html()
+    rebuild({'index', 'archive'}, env)
+
+    threading.Thread(target=watch, args=(env,), name='preview-watch', daemon=True).start()
+    server = ThreadingHTTPServer((args.host, args.port), PreviewHandler)
+    server.daemon_threads = True
+    print(f"👀 Preview on http://{args.host}:{args.port}/ (watching templates/ and data/, Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Preview stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Stage-level profiling for the fetch and render entry points
+给抓取 / 生成脚本加 --profile 模式，定位时间花在网络、JSON 解析、关键词筛选还是模板渲染
+
+    python src/fetch_enriched.py --profile                  阶段计时 + 采样调用栈
+    python src/generate_site.py --profile=cprofile,memory   另外导出 pstats、记录 tracemalloc 峰值
+    PROFILE=all python src/fetch_news.py                    CI 里用环境变量开启
+
+输出在 profile/ (PROFILE_DIR 可改)：
+    <entry>.profile.json   各阶段的调用次数、墙钟时间、CPU 时间、内存峰值
+    <entry>.collapsed      折叠调用栈 (flamegraph.pl / speedscope 可直接打开)，栈底带阶段名
+    <entry>.pstats         cProfile 结果 (python -m pstats 查看)
+    report.txt / all.collapsed   所有入口的汇总
+
+线程池里进入的阶段 (比如 http、fetch.<name>) 按线程单独嵌套，在报告里显示为顶层阶段，
+和主线程的阶段在时间上是重叠的。
+
+不开启时 stage() 只多一次函数调用，脚本行为不变。
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from glob import glob
+from typing import Callable, Dict, List, Optional, Set
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profile'))
+# 调用栈采样间隔 (秒)
+SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+OPTIONS = {'cprofile', 'memory'}
+# 采样时跳过的框架代码
+_SKIP_FILES = ('contextlib.py', 'profiling.py', 'threading.py')
+
+_recorder = None
+
+
+class _Recorder:
+    """一次运行的阶段统计 + 调用栈采样"""
+
+    def __init__(self, entry: str, options: Set[str]):
+        self.entry = entry
+        self.options = options
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict] = {}
+        self.local = threading.local()
+        self.active: Dict[int, List[str]] = {}
+        self.samples = Counter()
+        self.memory_stack: List[List[int]] = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+            self.active[threading.get_ident()] = stack
+        return stack
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stack()
+        stack.append(name)
+        path = '/'.join(stack)
+        main_thread = threading.current_thread() is threading.main_thread()
+        # 内存峰值只在主线程上按嵌套记录，工作线程的阶段与其他线程重叠，无法区分
+        track_memory = main_thread and tracemalloc.is_tracing()
+        if track_memory:
+            if self.memory_stack:
+                parent = self.memory_stack[-1]
+                parent[0] = max(parent[0], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.memory_stack.append([0])
+        # 主线程阶段常常在等线程池，记进程 CPU；工作线程里记本线程 CPU
+        cpu_clock = time.process_time if main_thread else time.thread_time
+        wall_start, cpu_start = time.perf_counter(), cpu_clock()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = cpu_clock() - cpu_start
+            peak = None
+            if track_memory:
+                peak = max(self.memory_stack.pop()[0], tracemalloc.get_traced_memory()[1])
+                if self.memory_stack:
+                    self.memory_stack[-1][0] = max(self.memory_stack[-1][0], peak)
+            stack.pop()
+            with self.lock:
+                entry = self.stats.setdefault(path, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak_mb': None})
+                entry['calls'] += 1
+                entry['wall'] += wall
+                entry['cpu'] += cpu
+                if peak is not None:
+                    entry['peak_mb'] = max(entry['peak_mb'] or 0, peak / 1048576)
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            for ident, frame in sys._current_frames().items():
+                stages = self.active.get(ident)
+                if ident == own or (ident != main and not stages):
+                    continue  # 空闲的线程池线程
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    filename = os.path.basename(code.co_filename)
+                    if filename not in _SKIP_FILES:
+                        name = getattr(code, 'co_qualname', code.co_name)
+                        frames.append(f"{filename}:{name}")
+                    frame = frame.f_back
+                prefix = [self.entry] + [f"[{stage}]" for stage in (stages or [])]
+                self.samples[';'.join(prefix + frames[::-1])] += 1
+
+    def start(self):
+        if 'memory' in self.options:
+            tracemalloc.start()
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def stage(name: str):
+    """阶段计时：with stage('render'): ...，没开 --profile 时什么都不做"""
+    if _recorder is None:
+        return _NULL_STAGE
+    return _recorder.stage(name)
+
+
+class _NullStage:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def timed(name: str, fn: Callable) -> Callable:
+    """把函数包成一个阶段，方便交给线程池：pool.submit(timed('fetch.weibo', fn))"""
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def parse_options(argv: List[str]) -> Optional[Set[str]]:
+    """从命令行 (--profile[=cprofile,memory|all]) 或 PROFILE 环境变量读取选项，并把参数从 argv 移除"""
+    spec = None
+    for arg in list(argv[1:]):
+        if arg == '--profile' or arg.startswith('--profile='):
+            argv.remove(arg)
+            spec = arg.partition('=')[2] or '1'
+    if spec is None:
+        spec = os.environ.get('PROFILE', '')
+    if spec.lower() in ('', '0', 'false', 'no'):
+        return None
+    options = {part.strip().lower() for part in spec.split(',')} - {'1', 'true', 'yes', ''}
+    if 'all' in options:
+        return set(OPTIONS)
+    unknown = options - OPTIONS
+    if unknown:
+        print(f"⚠️  Ignoring unknown profile options: {', '.join(sorted(unknown))}")
+    return options & OPTIONS
+
+
+def run_profiled(entry: str, main: Callable):
+    """入口脚本的 __main__ 调用它；没开 --profile 时直接执行 main()"""
+    global _recorder
+    options = parse_options(sys.argv)
+    if options is None:
+        return main()
+
+    recorder = _recorder = _Recorder(entry, options)
+    profiler = cProfile.Profile() if 'cprofile' in options else None
+    started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    recorder.start()
+    if profiler:
+        profiler.enable()
+    try:
+        with stage('total'):
+            return main()
+    finally:
+        if profiler:
+            profiler.disable()
+        recorder.stop()
+        _recorder = None
+        write_report(recorder, profiler, started_at)
+
+
+def _pstats_top(profiler: cProfile.Profile, limit: int = 25) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def write_report(recorder: _Recorder, profiler: Optional[cProfile.Profile], started_at: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    entry = recorder.entry
+    stages = [dict(path=path, **{key: round(value, 4) if isinstance(value, float) else value
+                                 for key, value in stats.items()})
+              for path, stats in sorted(recorder.stats.items())]
+    result = {
+        'entry': entry,
+        'started_at': started_at,
+        'options': sorted(recorder.options),
+        'sample_interval': SAMPLE_INTERVAL,
+        'samples': sum(recorder.samples.values()),
+        'stages': stages,
+    }
+
+    if profiler:
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f'{entry}.pstats'))
+        result['pstats_top'] = _pstats_top(profiler)
+    with open(os.path.join(PROFILE_DIR, f'{entry}.profile.json'), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(PROFILE_DIR, f'{entry}.collapsed'), 'w', encoding='utf-8') as f:
+        for stack, count in sorted(recorder.samples.items()):
+            f.write(f"{stack} {count}\n")
+
+    print(format_stages(result))
+    write_summary()
+    print(f"📈 Profile written to {PROFILE_DIR} ({entry}.profile.json, {entry}.collapsed"
+          f"{', ' + entry + '.pstats' if profiler else ''})")
+
+
+def format_stages(result: Dict) -> str:
+    lines = [f"⏱️  {result['entry']} ({result['started_at']}, options: {', '.join(result['options']) or 'timers'})",
+             f"   {'stage':<40} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'peak MB':>9}"]
+    for row in result['stages']:
+        depth = row['path'].count('/')
+        name = '  ' * depth + row['path'].rsplit('/', 1)[-1]
+        peak = f"{row['peak_mb']:.1f}" if row['peak_mb'] is not None else '-'
+        lines.append(f"   {name:<40} {row['calls']:>6} {row['wall']:>9.3f} {row['cpu']:>9.3f} {peak:>9}")
+    return '\n'.join(lines)
+
+
+def write_summary():
+    """把 profile/ 里所有入口的结果合并成 report.txt 和 all.collapsed"""
+    results = []
+    for path in sorted(glob(os.path.join(PROFILE_DIR, '*.profile.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    sections = []
+    for result in results:
+        section = format_stages(result)
+        if result.get('pstats_top'):
+            section += '\n\n' + result['pstats_top']
+        sections.append(section)
+    with open(os.path.join(PROFILE_DIR, 'report.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join(sections) + '\n')
+
+    with open(os.path.join(PROFILE_DIR, 'all.collapsed'), 'w', encoding='utf-8') as out:
+        for result in results:
+            path = os.path.join(PROFILE_DIR, f"{result['entry']}.collapsed")
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    out.write(f.read())
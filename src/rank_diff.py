@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Rank-movement and new-entry detection
+和上一次抓取的排名对比：排名变化、新上榜、热度变化
+
+上一次的排名只保存在 data/rank_snapshot.json (每个榜单一张哈希表)，
+每个榜单 O(n) 完成对比，不需要读取历史数据文件。
+"""
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from boards import enriched_boards, heat_value
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_PATH = os.path.join(BASE_DIR, 'data', 'rank_snapshot.json')
+
+_UNITS = {'万': 1e4, '亿': 1e8, 'k': 1e3, 'm': 1e6, 'b': 1e9}
+_HEAT_RE = re.compile(r'([\d,]*\.?\d+)\s*(万|亿|k|m|b)?', re.IGNORECASE)
+_PUNCT_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """全角转半角、小写、去掉空白和标点，'【震撼】DeepSeek R1' 与 '[震撼] deepseek r1' 视为同一条"""
+    return _PUNCT_RE.sub('', unicodedata.normalize('NFKC', title or '').lower())
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """去掉协议、www 和末尾斜杠；占位链接 ('#'、站点首页) 无法区分条目，返回 None"""
+    if not url or url.startswith('#'):
+        return None
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/')
+    if not path and not parts.query:
+        return None
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{path}?{parts.query}" if parts.query else f"{host}{path}"
+
+
+def item_key(item: Dict) -> str:
+    """条目的稳定标识：优先用规范化 URL，占位链接时退回规范化标题"""
+    url_key = normalize_url(item.get('url', ''))
+    return url_key or f"title:{normalize_title(item.get('title') or item.get('full_name', ''))}"
+
+
+def parse_heat(value) -> Optional[float]:
+    """'2580万' -> 25800000, '2.3k' -> 2300, 1234 -> 1234, '官方公告' -> None"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _HEAT_RE.search(str(value or ''))
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', ''))
+    unit = (match.group(2) or '').lower()
+    return number * _UNITS.get(unit, 1)
+
+
+def _board_snapshot(items: List[Dict]) -> Dict:
+    by_title, by_url = {}, {}
+    for rank, item in enumerate(items, 1):
+        entry = [rank, parse_heat(heat_value(item))]
+        title_key = normalize_title(item.get('title', ''))
+        if title_key:
+            by_title.setdefault(title_key, entry)
+        url_key = normalize_url(item.get('url', ''))
+        if url_key:
+            by_url.setdefault(url_key, entry)
+    return {'by_title': by_title, 'by_url': by_url}
+
+
+def diff_board(items: List[Dict], previous: Optional[Dict]):
+    """
+    原地给条目加上 rank_delta (正数表示上升)、is_new 和 heat_delta
+
+    previous 为 None 表示没有基线 (第一次运行或新榜单)，此时不标记新上榜。
+    """
+    for rank, item in enumerate(items, 1):
+        item['rank_delta'] = None
+        item['heat_delta'] = None
+        item['is_new'] = False
+        if previous is None:
+            continue
+        url_key = normalize_url(item.get('url', ''))
+        entry = previous['by_url'].get(url_key) if url_key else None
+        if entry is None:
+            entry = previous['by_title'].get(normalize_title(item.get('title', '')))
+        if entry is None:
+            item['is_new'] = True
+            continue
+        prev_rank, prev_heat = entry
+        item['rank_delta'] = prev_rank - rank
+        heat = parse_heat(heat_value(item))
+        if heat is not None and prev_heat is not None:
+            item['heat_delta'] = heat - prev_heat
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> Dict:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable rank snapshot: {e}")
+    return {}
+
+
+def annotate_enriched(enriched: Dict, path: str = SNAPSHOT_PATH) -> Dict:
+    """对比上次快照标注所有榜单，然后把本次排名写成新快照"""
+    previous = load_snapshot(path)
+    boards = enriched_boards(enriched)
+    snapshot = {}
+    for name, items in boards.items():
+        diff_board(items, previous.get(name))
+        snapshot[name] = _board_snapshot(items)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+
+    new_count = sum(item['is_new'] for items in boards.values() for item in items)
+    print(f"📈 Rank diff: {new_count} new entries across {len(boards)} boards")
+    return enriched
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Service worker generation
+根据本次构建的文件内容哈希生成 dist/sw.js
+
+- 页面外壳 (index.html) 和本地静态资源进入预缓存，每个文件带内容哈希作为 revision
+- 新部署时只有 revision 变化的文件会重新下载，其余继续用缓存
+- api/ 和 feeds/ 数据走 stale-while-revalidate，第三方图片走缓存优先
+"""
+import hashlib
+import os
+from typing import List, Tuple
+
+from jinja2 import Environment, FileSystemLoader
+
+# 预缓存的本地静态资源 (相对 dist)；数据文件不在此列，运行时按需缓存
+PRECACHE_DIRS = ('img',)
+PRECACHE_EXTENSIONS = ('.html', '.css', '.js', '.webp', '.png', '.svg', '.ico')
+
+
+def file_revision(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def build_manifest(output_dir: str) -> List[Tuple[str, str]]:
+    """[(相对路径, revision)]，按路径排序保证输出稳定"""
+    manifest = []
+    index_path = os.path.join(output_dir, 'index.html')
+    if os.path.exists(index_path):
+        revision = file_revision(index_path)
+        manifest += [('./', revision), ('index.html', revision)]
+
+    for directory in PRECACHE_DIRS:
+        root = os.path.join(output_dir, directory)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(PRECACHE_EXTENSIONS):
+                    path = os.path.join(dirpath, filename)
+                    relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+                    manifest.append((relative, file_revision(path)))
+    return sorted(manifest)
+
+
+def write_service_worker(output_dir: str, template_dir: str) -> str:
+    manifest = build_manifest(output_dir)
+    build = hashlib.sha256(repr(manifest).encode('utf-8')).hexdigest()[:12]
+    env = Environment(loader=FileSystemLoader(template_dir))
+    script = env.get_template('sw.js').render(build=build, manifest=[list(entry) for entry in manifest])
+
+    sw_path = os.path.join(output_dir, 'sw.js')
+    with open(sw_path, 'w', encoding='utf-8') as f:
+        f.write(script)
+    print(f"🧰 Service worker: {len(manifest)} precached files, build {build}")
+    return sw_path
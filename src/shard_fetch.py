@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Sharded multi-worker fetch for AI News Station
+把所有抓取源分片到 N 个进程 / 机器上执行，再确定性地合并回 data/*.json
+
+用法：
+    # 每个 worker (进程或机器) 跑自己的分片
+    python src/shard_fetch.py run --shard 0 --num-shards 3
+    python src/shard_fetch.py run --shard 1 --num-shards 3
+    python src/shard_fetch.py run --shard 2 --num-shards 3
+    # 收齐分片文件后合并
+    python src/shard_fetch.py merge --num-shards 3
+
+    # 本机多进程：一次跑完所有分片并合并
+    python src/shard_fetch.py local --workers 3
+
+分片按上游分组：共用同一个上游的源 (DailyHotApi 那台机器、tenapi.cn) 总是在同一个分片里。
+http_client 的限速桶是进程内的，如果把它们分散到 N 个进程 / 机器，上游实际收到的是
+N 倍的 HOST_LIMITS 速率。代价是这几个源不会因为分片变快 (反正受单机限速约束)，
+分片之间的负载也不完全均匀；另一种做法是按分片数除以每个主机的速率，但那要求所有
+分片同时运行，且每个主机都要单独配置，所以没有采用。
+
+每个分片写出 shard-<i>-of-<n>.json 和 shard-<i>-of-<n>.manifest.json
+(包含源列表和结果文件的 sha256)，merge 会校验分片齐全、校验和一致、
+每个源恰好出现一次，再按固定顺序组装输出，所以结果与分片方式无关。
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import fetch_enriched
+import fetch_github
+import fetch_news
+import fetch_trending
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARD_DIR = os.path.join(BASE_DIR, 'data', 'shards')
+
+# 全部抓取源，名称带模块前缀；顺序即合并顺序
+SOURCES: List[Tuple[str, Callable[[], List[Dict]]]] = sorted(
+    [(f'enriched.{name}', fn) for name, fn in fetch_enriched.FETCHERS] + [
+        ('news.hacker_news', fetch_news.fetch_hacker_news_ai),
+        ('github.trends', fetch_github.fetch_github_trends),
+        ('trending.weibo', fetch_trending.fetch_weibo_trending),
+        ('trending.zhihu', fetch_trending.fetch_zhihu_trending),
+        ('trending.baidu', fetch_trending.fetch_baidu_trending),
+    ],
+    key=lambda source: source[0],
+)
+
+# 共用同一个上游 (同一个限速桶) 的源，必须分在同一个分片
+UPSTREAM_GROUPS: Dict[str, List[str]] = {
+    'dailyhot': sorted(f'enriched.{name}' for name in fetch_enriched.DAILYHOT_FETCHERS),
+    'tenapi': ['trending.baidu', 'trending.weibo', 'trending.zhihu'],
+}
+
+
+def _source_units() -> List[List[str]]:
+    """上游分组各算一个单元，其余每个源单独一个单元"""
+    grouped = {name for names in UPSTREAM_GROUPS.values() for name in names}
+    units = [sorted(names) for names in UPSTREAM_GROUPS.values()]
+    units += [[name] for name, _ in SOURCES if name not in grouped]
+    return units
+
+
+def sources_for_shard(shard: int, num_shards: int) -> List[Tuple[str, Callable[[], List[Dict]]]]:
+    """
+    大的单元先分，每个单元放进当前源最少的分片 (相同时取编号小的)；
+    只依赖源名称，同样的 N 总是得到同样的划分
+    """
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+    assigned: List[List[str]] = [[] for _ in range(num_shards)]
+    for unit in sorted(_source_units(), key=lambda unit: (-len(unit), unit[0])):
+        min(assigned, key=len).extend(unit)
+    names = set(assigned[shard])
+    return [source for source in SOURCES if source[0] in names]
+
+
+def shard_paths(shard: int, num_shards: int, shard_dir: str = SHARD_DIR) -> Tuple[str, str]:
+    stem = os.path.join(shard_dir, f'shard-{shard}-of-{num_shards}')
+    return f'{stem}.json', f'{stem}.manifest.json'
+
+
+def _run_source(name: str, fn: Callable[[], List[Dict]]) -> Dict:
+    start = time.monotonic()
+    try:
+        items, error = fn(), None
+    except Exception as e:
+        print(f"❌ {name} failed: {e}")
+        items, error = [], str(e)
+    return {'items': items, 'error': error, 'elapsed': round(time.monotonic() - start, 3)}
+
+
+def run_shard(shard: int, num_shards: int, run_id: str = 'local', shard_dir: str = SHARD_DIR) -> str:
+    """抓取本分片负责的源，写出结果文件和 manifest，返回 manifest 路径"""
+    sources = sources_for_shard(shard, num_shards)
+    print(f"🧩 Shard {shard}/{num_shards}: {', '.join(name for name, _ in sources)}")
+
+    with ThreadPoolExecutor(max_workers=max(len(sources), 1)) as pool:
+        futures = {name: pool.submit(_run_source, name, fn) for name, fn in sources}
+        results = {name: future.result() for name, future in futures.items()}
+
+    os.makedirs(shard_dir, exist_ok=True)
+    result_path, manifest_path = shard_paths(shard, num_shards, shard_dir)
+    payload = json.dumps({'sources': results}, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    with open(result_path, 'wb') as f:
+        f.write(payload)
+
+    manifest = {
+        'run_id': run_id,
+        'shard': shard,
+        'num_shards': num_shards,
+        'sources': sorted(results),
+        'result_file': os.path.basename(result_path),
+        'sha256': hashlib.sha256(payload).hexdigest(),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"📁 Shard {shard} saved to: {result_path}")
+    return manifest_path
+
+
+def load_shards(num_shards: int, run_id: str = None, shard_dir: str = SHARD_DIR) -> Tuple[Dict[str, List[Dict]], str]:
+    """读取并校验全部分片，返回 (源名称 -> items, 最晚的 generated_at)"""
+    results = {}
+    generated_at = []
+    for shard in range(num_shards):
+        result_path, manifest_path = shard_paths(shard, num_shards, shard_dir)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Missing manifest for shard {shard}/{num_shards}: {manifest_path}")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if run_id and manifest.get('run_id') != run_id:
+            raise ValueError(f"Shard {shard} belongs to run {manifest.get('run_id')!r}, expected {run_id!r}")
+
+        with open(result_path, 'rb') as f:
+            payload = f.read()
+        if hashlib.sha256(payload).hexdigest() != manifest['sha256']:
+            raise ValueError(f"Checksum mismatch for shard {shard}: {result_path}")
+
+        expected = [name for name, _ in sources_for_shard(shard, num_shards)]
+        if manifest['sources'] != sorted(expected):
+            raise ValueError(f"Shard {shard} covers {manifest['sources']}, expected {sorted(expected)}")
+
+        for name, result in json.loads(payload)['sources'].items():
+            if name in results:
+                raise ValueError(f"Source {name} appears in more than one shard")
+            results[name] = result['items']
+        generated_at.append(manifest['generated_at'])
+
+    return results, max(generated_at)
+
+
+def merge(num_shards: int, run_id: str = None, shard_dir: str = SHARD_DIR):
+    """合并分片并写出 news.json / github.json / trending.json / enriched_trending.json"""
+    results, generated_at = load_shards(num_shards, run_id, shard_dir)
+    print(f"🔗 Merging {len(results)} sources from {num_shards} shards...")
+
+    # news.json 要先写，enriched 里的 AI 新闻从它筛选
+    fetch_news.save_news(results['news.hacker_news'], generated_at=generated_at)
+    fetch_github.save_repos(results['github.trends'])
+    fetch_trending.save_trending(results['trending.weibo'], results['trending.zhihu'],
+                                 results['trending.baidu'], last_updated=generated_at)
+
+    enriched = {name.split('.', 1)[1]: items for name, items in results.items() if name.startswith('enriched.')}
+    fetch_enriched.save_enriched(fetch_enriched.build_enriched(enriched, last_updated=generated_at))
+
+
+def run_local(workers: int, run_id: str = 'local', shard_dir: str = SHARD_DIR):
+    """在本机用 workers 个进程跑完所有分片，然后合并"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run_shard, range(workers), [workers] * workers, [run_id] * workers, [shard_dir] * workers))
+    merge(workers, run_id, shard_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded fetch for AI News Station')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='fetch one shard')
+    run_parser.add_argument('--shard', type=int, required=True)
+    run_parser.add_argument('--num-shards', type=int, required=True)
+
+    merge_parser = sub.add_parser('merge', help='merge all shard files')
+    merge_parser.add_argument('--num-shards', type=int, required=True)
+
+    local_parser = sub.add_parser('local', help='run all shards in local processes, then merge')
+    local_parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+
+    for p in (run_parser, merge_parser, local_parser):
+        p.add_argument('--run-id', default=os.environ.get('GITHUB_RUN_ID', 'local'))
+        p.add_argument('--shard-dir', default=SHARD_DIR)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run_shard(args.shard, args.num_shards, args.run_id, args.shard_dir)
+    elif args.command == 'merge':
+        merge(args.num_shards, args.run_id, args.shard_dir)
+    else:
+        run_local(min(args.workers, len(_source_units())), args.run_id, args.shard_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Static JSON API with delta files
+生成静态 JSON API，客户端只需轮询很小的 latest.json，再按需拉增量
+
+    dist/api/latest.json                       每个榜单的当前版本号 (内容哈希)
+    dist/api/boards/<board>.json               榜单完整数据
+    dist/api/deltas/<board>/<from>.json        从版本 <from> 到下一个版本的增量
+
+客户端持有版本 v 时：latest.json 里版本不同 -> 拉 deltas/<board>/<v>.json 并应用，
+得到的新版本若仍不是最新就继续沿链拉取；增量文件缺失 (太旧被清理) 时重新拉完整数据。
+上一个版本从 dist 中已发布的文件读取，不需要额外状态。
+
+增量格式：
+    added    [{'key', 'index', 'item'}]              新条目 (完整数据)
+    removed  [key]
+    moved    [{'key', 'from', 'to'}]
+    changed  [{'key', 'set': {字段: 新值}, 'unset': [字段]}]   只包含变化的字段
+
+排名变化、热度变化、是否新上榜、链接状态 (VOLATILE_FIELDS) 每轮都会变，
+不写进 API 数据，也不参与版本哈希，否则每轮每个榜单都会产生一个增量。
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from rank_diff import item_key
+
+# 每个榜单保留的增量文件数
+MAX_DELTAS = 20
+# 渲染时的临时标注，不进入 API
+VOLATILE_FIELDS = ('rank_delta', 'heat_delta', 'is_new', 'link_status')
+
+
+def api_items(items: List[Dict]) -> List[Dict]:
+    """去掉临时标注字段后的条目"""
+    return [{k: v for k, v in item.items() if k not in VOLATILE_FIELDS} for item in items]
+
+
+def board_version(items: List[Dict]) -> str:
+    payload = json.dumps(items, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def item_patch(old_item: Dict, new_item: Dict) -> Dict:
+    """字段级补丁：{'set': {字段: 新值}, 'unset': [删除的字段]}，没有删除时省略 unset"""
+    patch = {'set': {k: v for k, v in new_item.items() if old_item.get(k, object()) != v}}
+    unset = [k for k in old_item if k not in new_item]
+    if unset:
+        patch['unset'] = unset
+    return patch
+
+
+def compute_delta(old_items: List[Dict], new_items: List[Dict]) -> Dict:
+    """按 item_key 对比两个版本 (传入的应是 api_items 处理后的条目)：新增、删除、位置变化、字段变化"""
+    old_index = {}
+    for position, item in enumerate(old_items):
+        old_index.setdefault(item_key(item), (position, item))
+    new_keys = set()
+    added, moved, changed = [], [], []
+    for position, item in enumerate(new_items):
+        key = item_key(item)
+        if key in new_keys:
+            continue
+        new_keys.add(key)
+        if key not in old_index:
+            added.append({'key': key, 'index': position, 'item': item})
+            continue
+        old_position, old_item = old_index[key]
+        if old_position != position:
+            moved.append({'key': key, 'from': old_position, 'to': position})
+        if old_item != item:
+            changed.append(dict(key=key, **item_patch(old_item, item)))
+    removed = [key for key in old_index if key not in new_keys]
+    return {'added': added, 'removed': removed, 'moved': moved, 'changed': changed}
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _prune_deltas(delta_dir: str, history: List[str]):
+    """只保留 history 里的版本对应的增量文件 (按发布顺序记录，不依赖文件时间)"""
+    if not os.path.isdir(delta_dir):
+        return
+    keep = {f'{version}.json' for version in history}
+    for name in os.listdir(delta_dir):
+        if name.endswith('.json') and name not in keep:
+            os.remove(os.path.join(delta_dir, name))
+
+
+def publish_api(boards: Dict[str, List[Dict]], output_dir: str) -> Dict:
+    """写出各榜单数据、增量文件和 latest.json，返回 latest 清单"""
+    api_dir = os.path.join(output_dir, 'api')
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    latest = {'generated_at': generated_at, 'boards': {}}
+    changed_boards = 0
+
+    for board, items in boards.items():
+        items = api_items(items)
+        version = board_version(items)
+        board_path = os.path.join(api_dir, 'boards', f'{board}.json')
+        previous = _read_json(board_path)
+
+        if previous is None or previous.get('version') != version:
+            changed_boards += 1
+            delta_dir = os.path.join(api_dir, 'deltas', board)
+            history = []
+            if previous is not None:
+                delta = compute_delta(previous.get('items', []), items)
+                delta.update({'board': board, 'from': previous['version'], 'to': version})
+                _write_json(os.path.join(delta_dir, f"{previous['version']}.json"), delta)
+                history = (previous.get('history', []) + [previous['version']])[-MAX_DELTAS:]
+                _prune_deltas(delta_dir, history)
+            _write_json(board_path, {'board': board, 'version': version, 'updated_at': generated_at,
+                                     'history': history, 'items': items})
+            updated_at = generated_at
+        else:
+            updated_at = previous.get('updated_at', generated_at)
+
+        latest['boards'][board] = {
+            'version': version,
+            'updated_at': updated_at,
+            'count': len(items),
+            'url': f'api/boards/{board}.json',
+        }
+
+    # 没有榜单变化时不重写 latest.json，保持 ETag / Last-Modified 不变
+    latest_path = os.path.join(api_dir, 'latest.json')
+    previous_latest = _read_json(latest_path)
+    if previous_latest and previous_latest.get('boards') == latest['boards']:
+        latest = previous_latest
+    else:
+        _write_json(latest_path, latest)
+    print(f"🔌 Static API: {changed_boards}/{len(boards)} boards changed, manifest at {api_dir}/latest.json")
+    return latest
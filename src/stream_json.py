@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Limit-aware streaming JSON decoding
+增量解析响应流，只读取前 N 个列表元素就停止，不再 response.json() 解码整个列表
+
+支持两种上游格式：
+    [1, 2, 3, ...]                         # 例如 HN topstories.json
+    {"code": 200, ..., "data": [{...}, ...]}  # DailyHotApi / tenapi
+对象形式下，读到目标 key 的前 N 个元素后立即停止，出现在它之后的字段不会被读取。
+"""
+import codecs
+import json
+from typing import Any, Iterator, Optional
+
+from profiling import stage
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+
+class _StreamReader:
+    """在不断增长的文本缓冲区上用 raw_decode 逐个解析值"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.text = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        # 丢弃已消费的部分，避免缓冲区无限增长
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.buf += self.text.decode(chunk)
+                return True
+        self.buf += self.text.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, got {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # 数字可能刚好被 chunk 截断："12" 后面还有 "3"，或者 "1." / "3e" 只解析出了 1 / 3；
+            # 数字后面只剩可能属于它的字符时，再读一块确认
+            if not self.eof and isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and not self.buf[end:].strip(_NUMBER_CHARS):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def array(self, limit: Optional[int]) -> list:
+        """读取数组，拿到 limit 个元素后停止 (不再读取剩余部分)"""
+        self.expect('[')
+        items = []
+        if self.peek() == ']':
+            self.pos += 1
+            return items
+        while limit is None or len(items) < limit:
+            items.append(self.value())
+            sep = self.peek()
+            self.pos += 1
+            if sep == ']':
+                break
+            if sep != ',':
+                raise ValueError(f"Expected ',' or ']' in array, got {sep!r}")
+        return items
+
+
+def load_prefix(chunks: Iterator[bytes], key: Optional[str] = 'data', limit: Optional[int] = None) -> Any:
+    """
+    从字节流中解析 JSON，最多保留 limit 个列表元素
+
+    顶层是数组时直接截取；顶层是对象时截取 key 对应的数组，
+    读到足够元素后立即返回 (之前的字段都会保留)。
+    """
+    reader = _StreamReader(chunks)
+    first = reader.peek()
+    if first == '[':
+        return reader.array(limit)
+    if first != '{':
+        return reader.value()
+
+    reader.expect('{')
+    result = {}
+    if reader.peek() == '}':
+        return result
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            result[name] = reader.array(limit)
+            if limit is not None and len(result[name]) >= limit:
+                return result
+        else:
+            result[name] = reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == '}':
+            return result
+        if sep != ',':
+            raise ValueError(f"Expected ',' or '}}' in object, got {sep!r}")
+
+
+def json_prefix(response, key: Optional[str] = 'data', limit: Optional[int] = None, chunk_size: int = 8192) -> Any:
+    """对 requests 的流式响应 (stream=True) 做 load_prefix，读完后关闭连接"""
+    try:
+        # 流式响应边下载边解析，这个阶段的时间也包含读取响应体
+        with stage('json'):
+            return load_prefix(response.iter_content(chunk_size=chunk_size), key=key, limit=limit)
+    finally:
+        response.close()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+LLM summarization stage for news and repos
+用 OpenAI 兼容接口为 HN 新闻和 GitHub 仓库批量生成一句话中文摘要
+
+- 按批发送 (SUMMARY_BATCH_SIZE 条/请求)，并发数受 SUMMARY_CONCURRENCY 限制
+- 新闻带上 extract_articles 抽取的导语 (preview.lead) 作为正文，没有导语时只有标题和来源
+- 摘要按 sha256(url + title [+ 导语]) 缓存在 data/cache/summaries.json，没变的条目不会再花钱；
+  导语出现后 key 随之变化，摘要会基于导语重新生成
+- 接口地址和密钥沿用 OpenAI SDK 的 OPENAI_BASE_URL / OPENAI_API_KEY
+
+本地测试可以先起一个假接口：
+    python src/summarize.py --stub-server --port 8808
+    OPENAI_BASE_URL=http://127.0.0.1:8808/v1 OPENAI_API_KEY=stub python src/summarize.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'summaries.json')
+
+SUMMARY_MODEL = os.environ.get('SUMMARY_MODEL', 'gpt-4o-mini')
+SUMMARY_BATCH_SIZE = int(os.environ.get('SUMMARY_BATCH_SIZE', '10'))
+SUMMARY_CONCURRENCY = int(os.environ.get('SUMMARY_CONCURRENCY', '4'))
+
+SYSTEM_PROMPT = (
+    "你是科技新闻编辑。为每个条目写一句不超过60字的中文摘要，说明它是什么、为什么值得关注。"
+    "只返回 JSON：{\"summaries\": [{\"id\": <id>, \"summary\": \"...\"}]}，id 与输入一致。"
+)
+
+
+def cache_key(url: str, title: str, lead: str = '') -> str:
+    # 没有导语时保持旧的 key，已有缓存继续有效
+    text = f"{url}\n{title}\n{lead}" if lead else f"{url}\n{title}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_cache(path: str = CACHE_PATH) -> Dict[str, str]:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable summary cache: {e}")
+    return {}
+
+
+def save_cache(cache: Dict[str, str], path: str = CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def _parse_summaries(content: str) -> Dict[str, str]:
+    """解析模型返回的 JSON，容忍外面包了 ```json 代码块"""
+    content = content.strip()
+    if content.startswith('```'):
+        content = content.strip('`')
+        content = content[content.find('{'):]
+    data = json.loads(content[content.find('{'):content.rfind('}') + 1])
+    return {str(entry['id']): entry['summary'].strip()
+            for entry in data.get('summaries', []) if entry.get('summary')}
+
+
+def summarize_batch(client, batch: List[Dict]) -> Dict[str, str]:
+    """一次请求摘要一批条目，返回 cache_key -> summary"""
+    payload = [{'id': i, 'title': entry['title'], 'text': entry['text'][:500]}
+               for i, entry in enumerate(batch)]
+    response = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        temperature=0.2,
+        messages=[
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': json.dumps(payload, ensure_ascii=False)},
+        ],
+    )
+    summaries = _parse_summaries(response.choices[0].message.content or '{}')
+    return {entry['key']: summaries[str(i)] for i, entry in enumerate(batch) if str(i) in summaries}
+
+
+def collect_entries(news_items: List[Dict], github_items: List[Dict]) -> List[Dict]:
+    """把新闻和仓库统一成 (item, key, title, text)，item 用于回写摘要"""
+    entries = []
+    for item in news_items:
+        title = item.get('title') or ''
+        lead = (item.get('preview') or {}).get('lead') or ''
+        entries.append({'item': item, 'key': cache_key(item.get('url', ''), title, lead),
+                        'title': title, 'text': lead or item.get('source', '')})
+    for item in github_items:
+        title = item.get('full_name') or item.get('name') or ''
+        entries.append({'item': item, 'key': cache_key(item.get('url', ''), title),
+                        'title': title, 'text': item.get('description') or ''})
+    return entries
+
+
+def summarize_items(news_items: List[Dict], github_items: List[Dict], client=None) -> int:
+    """给条目写入 summary 字段，只对缓存里没有的条目调用模型，返回新生成的数量"""
+    cache = load_cache()
+    entries = collect_entries(news_items, github_items)
+    missing = list({entry['key']: entry for entry in entries if entry['key'] not in cache}.values())
+
+    if missing:
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(max_retries=3, timeout=60)
+        batches = [missing[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(missing), SUMMARY_BATCH_SIZE)]
+        start = time.monotonic()
+
+        def run(batch):
+            try:
+                return summarize_batch(client, batch)
+            except Exception as e:
+                print(f"❌ Summary batch of {len(batch)} failed: {e}")
+                return {}
+
+        with ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY) as pool:
+            for result in pool.map(run, batches):
+                cache.update(result)
+        print(f"🧠 Summarized {len(missing)} new items in {len(batches)} batches "
+              f"({time.monotonic() - start:.1f}s)")
+        save_cache(cache)
+    else:
+        print("🧠 All summaries cached, no model calls needed")
+
+    for entry in entries:
+        if entry['key'] in cache:
+            entry['item']['summary'] = cache[entry['key']]
+    return len(missing)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """最小的 /v1/chat/completions 假实现：摘要 = 标题截断"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        items = json.loads(body['messages'][-1]['content'])
+        content = json.dumps({'summaries': [{'id': item['id'], 'summary': f"[stub] {item['title'][:40]}"}
+                                            for item in items]}, ensure_ascii=False)
+        reply = json.dumps({
+            'id': 'stub', 'object': 'chat.completion', 'created': int(time.time()), 'model': body.get('model'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stub(port: int):
+    print(f"🧪 Stub OpenAI endpoint on http://127.0.0.1:{port}/v1")
+    ThreadingHTTPServer(('127.0.0.1', port), _StubHandler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize news and repos with an OpenAI-compatible model')
+    parser.add_argument('--stub-server', action='store_true', help='run a local stub endpoint instead')
+    parser.add_argument('--port', type=int, default=8808)
+    args = parser.parse_args()
+
+    if args.stub_server:
+        serve_stub(args.port)
+        return
+
+    if not os.environ.get('OPENAI_API_KEY'):
+        print("⚠️  OPENAI_API_KEY not set, skipping summarization")
+        return
+
+    news_path = os.path.join(BASE_DIR, 'data', 'news.json')
+    github_path = os.path.join(BASE_DIR, 'data', 'github.json')
+    with open(news_path, 'r', encoding='utf-8') as f:
+        news_data = json.load(f)
+    with open(github_path, 'r', encoding='utf-8') as f:
+        github_items = json.load(f)
+
+    summarize_items(news_data.get('news', []), github_items)
+
+    with open(news_path, 'w', encoding='utf-8') as f:
+        json.dump(news_data, f, indent=2, ensure_ascii=False)
+    with open(github_path, 'w', encoding='utf-8') as f:
+        json.dump(github_items, f, indent=2, ensure_ascii=False)
+    print(f"📁 Summaries written to {news_path} and {github_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Lightweight topic classifier for board routing
+轻量级主题分类器：字符 n-gram 哈希特征 + 线性模型，一次矩阵乘法给所有标题打分
+
+训练 (离线，用关键词列表和已有数据做弱监督，人工标注的标题优先)：
+    python src/topic_classifier.py train
+    python src/topic_classifier.py train --labels my_labels.jsonl
+data/ 里的标题按标题哈希固定留出 1/EVAL_FOLDS 作为验证集，报告的是验证集准确率；
+占位链接的条目 (各抓取脚本写死的 fallback 数据) 不参与训练和验证。
+验证集少于 MIN_EVAL_TITLES 条时不保存模型。
+人工标注文件 (默认 data/models/topic_labels.jsonl) 每行一个 {"title": ..., "label": ...}。
+
+模型保存在 data/models/topic_classifier.npz；模型不存在时路由自动跳过，
+榜单仍按原来的关键词规则生成。
+
+路由除了概率阈值，还要求标题有模型见过的 n-gram，且概率比只有偏置项时 (类别先验)
+高出 MIN_MARGIN：没有任何已知特征的标题只会得到先验分布，不能被当作有把握的结果。
+"""
+import argparse
+import glob
+import json
+import os
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, 'data', 'models', 'topic_classifier.npz')
+LABELS_PATH = os.path.join(BASE_DIR, 'data', 'models', 'topic_labels.jsonl')
+
+LABELS = ['entertainment', 'gaming', 'ai', 'other']
+DIM = 4096
+NGRAMS = (1, 2, 3)
+
+# 需要路由的榜单 -> 目标条数
+ROUTED_BOARDS = {'entertainment': 12, 'gaming': 10}
+# 低于这个概率的预测不用于路由
+MIN_CONFIDENCE = 0.7
+# 概率至少比类别先验 (空标题的预测) 高这么多才用于路由
+MIN_MARGIN = 0.2
+# 验证集占比 1/EVAL_FOLDS
+EVAL_FOLDS = 5
+# 验证集少于这个数时准确率不可信，不保存模型
+MIN_EVAL_TITLES = 20
+
+
+def _grams(title: str) -> List[int]:
+    text = unicodedata.normalize('NFKC', title or '').lower()
+    text = ' '.join(text.split())
+    return [zlib.crc32(text[i:i + n].encode('utf-8')) & (DIM - 1)
+            for n in NGRAMS for i in range(len(text) - n + 1)]
+
+
+def featurize(titles: List[str]) -> np.ndarray:
+    """标题 -> (n, DIM) 的 L2 归一化哈希 n-gram 计数矩阵"""
+    X = np.zeros((len(titles), DIM), dtype=np.float32)
+    rows, cols = [], []
+    for row, title in enumerate(titles):
+        grams = _grams(title)
+        rows.extend([row] * len(grams))
+        cols.extend(grams)
+    np.add.at(X, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.maximum(norms, 1e-6)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TopicClassifier:
+    def __init__(self, W: np.ndarray, b: np.ndarray, labels: List[str]):
+        self.W = W.astype(np.float32)
+        self.b = b.astype(np.float32)
+        self.labels = list(labels)
+
+    def predict_proba(self, titles: List[str]) -> np.ndarray:
+        """(n, 标签数) 的概率矩阵，所有标题一次矩阵乘法完成"""
+        if not titles:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return _softmax(featurize(titles) @ self.W + self.b)
+
+    def prior(self) -> np.ndarray:
+        """只有偏置项时的概率 (没有任何已知特征的标题得到的就是它)"""
+        return _softmax(self.b[None, :])[0]
+
+    def known(self, titles: List[str]) -> np.ndarray:
+        """每个标题是否至少有一个训练时见过 (权重非零) 的 n-gram"""
+        if not titles:
+            return np.zeros(0, dtype=bool)
+        trained = np.abs(self.W).sum(axis=1) > 0
+        return (featurize(titles)[:, trained] > 0).any(axis=1)
+
+    def save(self, path: str = MODEL_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, W=self.W.astype(np.float16), b=self.b, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> Optional['TopicClassifier']:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if data['W'].shape[0] != DIM:
+                print("⚠️  Topic model dimension mismatch, retrain with: python src/topic_classifier.py train")
+                return None
+            return cls(data['W'], data['b'], [str(label) for label in data['labels']])
+
+
+def train(titles: List[str], labels: List[str], epochs: int = 300, lr: float = 2.0, l2: float = 1e-4) -> TopicClassifier:
+    """全量梯度下降训练 softmax 回归"""
+    X = featurize(titles)
+    y = np.array([LABELS.index(label) for label in labels])
+    Y = np.eye(len(LABELS), dtype=np.float32)[y]
+    # 类别加权，避免 'other' 样本太多把其它类压没
+    weights = (len(y) / (len(LABELS) * np.maximum(np.bincount(y, minlength=len(LABELS)), 1)))[y][:, None]
+
+    W = np.zeros((DIM, len(LABELS)), dtype=np.float32)
+    b = np.zeros(len(LABELS), dtype=np.float32)
+    for _ in range(epochs):
+        grad = (_softmax(X @ W + b) - Y) * weights / len(y)
+        W -= lr * (X.T @ grad + l2 * W)
+        b -= lr * grad.sum(axis=0)
+    return TopicClassifier(W, b, LABELS)
+
+
+def weak_label(title: str) -> str:
+    """沿用各榜单的关键词规则给标题打弱标签"""
+    from fetch_enriched import AI_PATTERN, ENTERTAINMENT_PATTERN, GAMING_PATTERN
+    if GAMING_PATTERN.search(title):
+        return 'gaming'
+    if AI_PATTERN.search(title):
+        return 'ai'
+    if ENTERTAINMENT_PATTERN.search(title):
+        return 'entertainment'
+    return 'other'
+
+
+def _collect_titles(node, out: List[str]):
+    """收集有真实链接的条目标题；占位链接 ('#'、站点首页) 是写死的 fallback 数据，跳过"""
+    from check_links import is_placeholder
+    if isinstance(node, dict):
+        if isinstance(node.get('title'), str) and 'url' in node and not is_placeholder(node['url']):
+            out.append(node['title'])
+        for value in node.values():
+            _collect_titles(value, out)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_titles(value, out)
+
+
+def is_eval_title(title: str) -> bool:
+    """按标题哈希固定划分验证集，重新训练时划分不变"""
+    return zlib.crc32(title.encode('utf-8')) % EVAL_FOLDS == 0
+
+
+def load_labels(path: str = LABELS_PATH) -> Dict[str, str]:
+    """人工标注：JSON Lines，每行 {"title": ..., "label": ...}；文件不存在时返回空"""
+    labelled = {}
+    if not os.path.exists(path):
+        return labelled
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get('label') not in LABELS:
+                raise ValueError(f"{path}:{line_no}: unknown label {row.get('label')!r}")
+            labelled[row['title']] = row['label']
+    return labelled
+
+
+def build_training_set(labels_path: str = LABELS_PATH) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """
+    返回 (训练标题, 训练标签, 验证标题, 验证标签)；关键词本身只作为训练种子，不进验证集，
+    人工标注的标题和标签优先于关键词弱标签
+    """
+    from fetch_enriched import AI_KEYWORDS, ENTERTAINMENT_KEYWORDS, GAMING_KEYWORDS
+    titles, labels = [], []
+    eval_titles, eval_labels = [], []
+    for label, keywords in (('ai', AI_KEYWORDS), ('entertainment', ENTERTAINMENT_KEYWORDS),
+                            ('gaming', GAMING_KEYWORDS)):
+        titles.extend(keywords)
+        labels.extend([label] * len(keywords))
+
+    data_titles = []
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'data', '**', '*.json'), recursive=True)):
+        if os.sep + 'cache' + os.sep in path or os.sep + 'shards' + os.sep in path:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _collect_titles(json.load(f), data_titles)
+        except (OSError, ValueError):
+            continue
+    labelled = load_labels(labels_path)
+    for title in dict.fromkeys(list(labelled) + data_titles):
+        label = labelled.get(title) or weak_label(title)
+        if is_eval_title(title):
+            eval_titles.append(title)
+            eval_labels.append(label)
+        else:
+            titles.append(title)
+            labels.append(label)
+    return titles, labels, eval_titles, eval_labels
+
+
+def evaluate(model: TopicClassifier, titles: List[str], labels: List[str]) -> Dict[str, Tuple[int, int]]:
+    """各标签 (预测正确数, 样本数)，另有 'all' 汇总"""
+    predicted = [model.labels[int(i)] for i in model.predict_proba(titles).argmax(axis=1)] if titles else []
+    scores = {}
+    for label in LABELS + ['all']:
+        pairs = [(p, t) for p, t in zip(predicted, labels) if label in ('all', t)]
+        scores[label] = (sum(p == t for p, t in pairs), len(pairs))
+    return scores
+
+
+_model = None
+
+
+def get_model() -> Optional[TopicClassifier]:
+    global _model
+    if _model is None:
+        _model = TopicClassifier.load() or False
+    return _model or None
+
+
+def route_boards(results: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """
+    一次批量打分所有榜单的条目，把分类为娱乐 / 游戏的条目路由到对应榜单，
+    替换掉按热度补齐的 filler 条目；模型缺失时原样返回。
+    """
+    model = get_model()
+    if model is None:
+        return results
+
+    candidates = {}
+    for items in results.values():
+        for item in items:
+            if item.get('title') and item['title'] not in candidates:
+                candidates[item['title']] = item
+    titles = list(candidates)
+    proba = model.predict_proba(titles)
+    best = proba.argmax(axis=1)
+    # 只靠偏置项 (没有已知 n-gram、或概率不比先验高) 的预测不算数
+    confident = model.known(titles)[:, None] & (proba >= MIN_CONFIDENCE) & \
+        (proba - model.prior()[None, :] >= MIN_MARGIN)
+
+    for board, target in ROUTED_BOARDS.items():
+        if board not in results or board not in model.labels:
+            continue
+        column = model.labels.index(board)
+        kept = [item for item in results[board] if not item.get('filler')]
+        fillers = [item for item in results[board] if item.get('filler')]
+        seen = {item['title'] for item in kept}
+        order = np.argsort(-proba[:, column])
+        for i in order:
+            if len(kept) >= target:
+                break
+            if best[i] != column or not confident[i, column] or titles[i] in seen:
+                continue
+            source = candidates[titles[i]]
+            kept.append({'title': titles[i], 'url': source.get('url', '#'),
+                         'hot': str(source.get('hot', source.get('votes', ''))),
+                         'source': board, 'routed': True})
+            seen.add(titles[i])
+        routed = sum(1 for item in kept if item.get('routed'))
+        # 路由后仍不够，再用原来的 filler 补齐
+        for item in fillers:
+            if len(kept) >= target:
+                break
+            if item['title'] not in seen:
+                kept.append(item)
+        if routed:
+            print(f"🧭 Routed {routed} items to {board} board")
+        results[board] = kept
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Topic classifier for board routing')
+    sub = parser.add_subparsers(dest='command', required=True)
+    train_parser = sub.add_parser('train', help='train from keyword lists, labelled titles and existing data files')
+    train_parser.add_argument('--labels', default=LABELS_PATH, help='JSON Lines file of {"title", "label"}')
+    predict_parser = sub.add_parser('predict', help='score titles')
+    predict_parser.add_argument('titles', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        titles, labels, eval_titles, eval_labels = build_training_set(args.labels)
+        model = train(titles, labels)
+        counts = {label: labels.count(label) for label in LABELS}
+        print(f"✅ Trained on {len(titles)} titles {counts}")
+        scores = evaluate(model, eval_titles, eval_labels)
+        correct, total = scores.pop('all')
+        if total:
+            detail = ', '.join(f"{label} {c}/{n}" for label, (c, n) in scores.items() if n)
+            print(f"📊 Held-out accuracy {correct / total:.2%} on {total} titles ({detail})")
+        if total < MIN_EVAL_TITLES:
+            print(f"❌ Only {total} held-out titles (need {MIN_EVAL_TITLES}), model not saved;"
+                  f" add labelled titles to {args.labels}")
+            return
+        model.save()
+        print(f"📁 Saved to: {MODEL_PATH}")
+    else:
+        model = TopicClassifier.load()
+        if model is None:
+            print("❌ No model found, run: python src/topic_classifier.py train")
+            return
+        for title, row in zip(args.titles, model.predict_proba(args.titles)):
+            print(f"{model.labels[int(row.argmax())]:>14} {row.max():.2f}  {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+/* AI News Station service worker — generated by src/service_worker.py, do not edit dist/sw.js */
+const BUILD = '{{ build }}';
+const PRECACHE = 'ains-precache';
+const RUNTIME = 'ains-runtime';
+const IMAGES = 'ains-images';
+const MAX_IMAGES = 150;
+
+// [path, revision]: revision 是文件内容哈希，只有变化的文件才会重新下载
+const MANIFEST = {{ manifest | tojson }};
+
+const scopeUrl = (path) => new URL(path, self.registration.scope).href;
+const revKey = (path, rev) => scopeUrl(path) + (path.includes('?') ? '&' : '?') + '__rev=' + rev;
+const wanted = new Set(MANIFEST.map(([path, rev]) => revKey(path, rev)));
+const byUrl = new Map(MANIFEST.map(([path, rev]) => [scopeUrl(path), revKey(path, rev)]));
+
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        const cached = new Set((await cache.keys()).map((request) => request.url));
+        await Promise.all(MANIFEST.map(async ([path, rev]) => {
+            const key = revKey(path, rev);
+            if (cached.has(key)) return;
+            const response = await fetch(scopeUrl(path), { cache: 'no-cache' });
+            if (response.ok) await cache.put(key, response);
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        // 只删除本次构建里已变化或已移除的文件
+        const cache = await caches.open(PRECACHE);
+        await Promise.all((await cache.keys())
+            .filter((request) => !wanted.has(request.url))
+            .map((request) => cache.delete(request)));
+        // 上一版页面外壳在后台更新时存进了 RUNTIME，新构建的预缓存更新，丢掉旧副本
+        const runtime = await caches.open(RUNTIME);
+        await Promise.all((await runtime.keys())
+            .filter((request) => byUrl.has(request.url.split('?')[0]))
+            .map((request) => runtime.delete(request)));
+        await self.clients.claim();
+    })());
+});
+
+async function trimCache(name, max) {
+    const cache = await caches.open(name);
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(keys.length - max, 0)).map((key) => cache.delete(key)));
+}
+
+// 后台更新的响应只按请求 URL 存进 cacheName，不会写到带 __rev 的预缓存键下；
+// precacheKey 只在 cacheName 里还没有副本时作为兜底读取
+async function staleWhileRevalidate(event, cacheName, precacheKey) {
+    const cache = await caches.open(cacheName);
+    let cached = await cache.match(event.request);
+    if (!cached && precacheKey) {
+        cached = await (await caches.open(PRECACHE)).match(precacheKey);
+    }
+    const network = fetch(event.request).then((response) => {
+        if (response.ok) cache.put(event.request, response.clone());
+        return response;
+    }).catch(() => cached);
+    if (cached) {
+        event.waitUntil(network);
+        return cached;
+    }
+    return network;
+}
+
+async function cacheFirst(event, cacheName) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(event.request);
+    if (cached) return cached;
+    const response = await fetch(event.request);
+    if (response.ok || response.type === 'opaque') {
+        await cache.put(event.request, response.clone());
+        event.waitUntil(trimCache(cacheName, MAX_IMAGES));
+    }
+    return response;
+}
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+
+    // 页面外壳 (./ 和 index.html)：先用缓存，后台重新验证；
+    // 其他页面 (archive/、直接打开的 api / feeds) 不在清单里，交给网络
+    if (request.mode === 'navigate' && url.origin === self.location.origin) {
+        const key = byUrl.get(url.href.split('#')[0].split('?')[0]);
+        if (key) event.respondWith(staleWhileRevalidate(event, RUNTIME, key));
+        return;
+    }
+
+    if (url.origin === self.location.origin) {
+        const key = byUrl.get(url.href);
+        if (key) {
+            event.respondWith(caches.open(PRECACHE)
+                .then((cache) => cache.match(key))
+                .then((cached) => cached || fetch(request)));
+            return;
+        }
+        // 数据 (api / feeds)：先用缓存，后台更新
+        if (url.pathname.includes('/api/') || url.pathname.includes('/feeds/')) {
+            event.respondWith(staleWhileRevalidate(event, RUNTIME));
+        }
+        return;
+    }
+
+    // 第三方图片 (头像、展示图)：缓存优先
+    if (request.destination === 'image') {
+        event.respondWith(cacheFirst(event, IMAGES));
+    }
+});
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src/ 下的脚本按 python src/x.py 运行，互相直接 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from stream_json import load_prefix
+
+DOCUMENTS = [
+    (b'{"code":200,"data":[{"hot":1.5}, 7.25, 3]}', 'data', 5),
+    (b'[1,2,3e5,4]', None, None),
+    (b'[1,2,3E-5,4.0e+2, -0.5, 10]', None, 4),
+    (b'[12345, 678, 9]', None, 2),
+    (b'{"code":200,"data":[true,false,null,"\xe4\xb8\xad\xe6\x96\x87",{"a":[1.0,2]}],"after":1}', 'data', 3),
+    (b'{"code":200,"msg":"ok","data":[{"title":"x","hot":2580e4},{"title":"y","hot":-1.25E-3}],"n":9}', 'data', None),
+    (b'  [ 1 , 2.5 ,\n 3 ] ', None, None),
+    (b'42', None, None),
+    (b'-3.14e2', None, None),
+]
+
+
+def _expected(raw, key, limit):
+    data = json.loads(raw)
+    if isinstance(data, list):
+        return data[:limit] if limit is not None else data
+    if isinstance(data, dict) and limit is not None and len(data.get(key, [])) >= limit:
+        # 读够 limit 个元素后立即返回，key 之后的字段不会读取
+        names = list(data)
+        result = {name: data[name] for name in names[:names.index(key)]}
+        result[key] = data[key][:limit]
+        return result
+    return data
+
+
+@pytest.mark.parametrize('raw,key,limit', DOCUMENTS)
+def test_split_at_every_offset(raw, key, limit):
+    expected = _expected(raw, key, limit)
+    for offset in range(len(raw) + 1):
+        chunks = iter([raw[:offset], raw[offset:]])
+        assert load_prefix(chunks, key=key, limit=limit) == expected, offset
+
+
+@pytest.mark.parametrize('raw,key,limit', DOCUMENTS)
+def test_one_byte_chunks(raw, key, limit):
+    chunks = iter([raw[i:i + 1] for i in range(len(raw))])
+    assert load_prefix(chunks, key=key, limit=limit) == _expected(raw, key, limit)
+
+
+def test_numbers_split_after_dot_or_exponent():
+    chunks = iter([b'{"code":200,"data":[{"hot":1.', b'5}, 7.', b'25, 3]}'])
+    assert load_prefix(chunks, limit=5) == {'code': 200, 'data': [{'hot': 1.5}, 7.25, 3]}
+    assert load_prefix(iter([b'[1,2,3e', b'5,4]']), key=None) == [1, 2, 300000.0, 4]
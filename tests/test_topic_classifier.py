@@ -0,0 +1,52 @@
+import numpy as np
+
+import topic_classifier
+from topic_classifier import DIM, LABELS, TopicClassifier, route_boards, train
+
+UNRELATED = ['国务院召开常务会议', '美联储加息', '高铁票价调整']
+
+
+def _boards(titles):
+    return {
+        'entertainment': [],
+        'gaming': [],
+        'toutiao': [{'title': title, 'url': f'https://example.com/{i}', 'hot': i} for i, title in enumerate(titles)],
+    }
+
+
+def _routed(results):
+    return [item['title'] for board in ('entertainment', 'gaming') for item in results[board] if item.get('routed')]
+
+
+def test_bias_only_prediction_is_not_routed(monkeypatch):
+    # 先验偏向娱乐 (0.7007 > MIN_CONFIDENCE)，但没有任何训练过的特征
+    b = np.log(np.array([0.7007, 0.137, 0.073, 0.090], dtype=np.float32))
+    model = TopicClassifier(np.zeros((DIM, len(LABELS)), dtype=np.float32), b, LABELS)
+    monkeypatch.setattr(topic_classifier, '_model', model)
+
+    proba = model.predict_proba(UNRELATED)
+    assert np.allclose(proba, model.prior())
+    assert not model.known(UNRELATED).any()
+    assert _routed(route_boards(_boards(UNRELATED))) == []
+
+
+def test_titles_without_known_ngrams_are_not_routed(monkeypatch):
+    titles = ['明星恋情曝光', '演员官宣结婚', '歌手演唱会门票', '游戏新作发售', '电竞比赛决赛', '手游公测开启']
+    labels = ['entertainment'] * 3 + ['gaming'] * 3
+    model = train(titles, labels)
+    monkeypatch.setattr(topic_classifier, '_model', model)
+
+    # 哈希桶可能碰撞，known() 不一定为 False；概率比先验高不出 MIN_MARGIN 同样不路由
+    unseen = UNRELATED + ['Quarterly earnings report', 'Bond yields rise']
+    assert _routed(route_boards(_boards(unseen))) == []
+
+
+def test_known_titles_are_routed(monkeypatch):
+    titles = ['明星恋情曝光', '演员官宣结婚', '歌手演唱会门票', '游戏新作发售', '电竞比赛决赛', '手游公测开启']
+    labels = ['entertainment'] * 3 + ['gaming'] * 3
+    model = train(titles, labels)
+    monkeypatch.setattr(topic_classifier, '_model', model)
+
+    results = route_boards(_boards(['明星恋情曝光', 'Bond yields rise']))
+    assert [item['title'] for item in results['entertainment']] == ['明星恋情曝光']
+    assert results['gaming'] == []